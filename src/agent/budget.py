@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+
+from src.agent.outline import DocumentOutline
+
+_DEFAULT_LATENCY = {"plan": 15.0, "chunk": 20.0, "final": 30.0}
+
+
+class LatencyStats:
+    def __init__(self, alpha: float = 0.3, defaults: dict[str, float] | None = None) -> None:
+        self._alpha = alpha
+        self._estimates: dict[str, float] = dict(defaults or _DEFAULT_LATENCY)
+
+    def observe(self, stage: str, seconds: float) -> None:
+        current = self._estimates.get(stage)
+        if current is None:
+            self._estimates[stage] = seconds
+        else:
+            self._estimates[stage] = current + self._alpha * (seconds - current)
+
+    def estimate(self, stage: str) -> float:
+        return self._estimates.get(stage, max(self._estimates.values(), default=20.0))
+
+
+@dataclass(frozen=True)
+class ExecutionBudget:
+    deadline: float
+    finalize_reserve: float
+    skip_planning: bool
+    chunk_tokens: int
+    concurrency: int
+
+
+def plan_budget(
+    time_budget_s: float,
+    document_tokens: int,
+    chunk_tokens: int,
+    max_concurrency: int,
+    max_budget_concurrency: int,
+    latency: LatencyStats,
+    now: float,
+) -> ExecutionBudget:
+    plan_s = latency.estimate("plan")
+    chunk_s = max(latency.estimate("chunk"), 0.001)
+    final_s = latency.estimate("final")
+    skip_planning = time_budget_s < plan_s + chunk_s + final_s
+    available = time_budget_s - final_s - (0.0 if skip_planning else plan_s)
+    waves = max(1, math.floor(available / chunk_s))
+    chunks = max(1, math.ceil(document_tokens / max(1, chunk_tokens)))
+    concurrency = max(max_concurrency, math.ceil(chunks / waves))
+    concurrency = max(1, min(concurrency, max_budget_concurrency, chunks))
+    capacity = waves * concurrency
+    if chunks > capacity:
+        chunk_tokens = min(math.ceil(document_tokens / capacity), chunk_tokens * 4)
+    return ExecutionBudget(
+        deadline=now + time_budget_s,
+        finalize_reserve=final_s,
+        skip_planning=skip_planning,
+        chunk_tokens=chunk_tokens,
+        concurrency=concurrency,
+    )
+
+
+def outline_plan_titles(outline: DocumentOutline, max_items: int = 8) -> list[str]:
+    if not outline.sections:
+        return []
+    top = min(s.level for s in outline.sections)
+    titles = [s.title for s in outline.sections if s.level == top and s.title]
+    return titles[:max_items]
@@ -3,10 +3,11 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import Any
 
-from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from langchain_core.messages import AIMessage, HumanMessage
 
 from src.models.entities import Message
 from src.models.provider import ChatModel
+from src.prompt.assembly import PromptLayout
 
 
 @dataclass(frozen=True)
@@ -15,9 +16,8 @@ class ChatService:
     system_prompt: str
 
     async def reply(self, language: str, history: list[Message]) -> str:
-        messages: list[Any] = [
-            SystemMessage(content=f"{self.system_prompt}\n\nLanguage: {language}"),
-        ]
+        layout = PromptLayout(system_prompt=self.system_prompt, language=language)
+        messages: list[Any] = [layout.system_message()]
         for m in history:
             if m.role == "user":
                 messages.append(HumanMessage(content=m.content))
@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import hashlib
+import re
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Protocol
+
+from src.utils.tokens import estimate_tokens
+
+_HEADING_RE = re.compile(
+    r"^\s{0,3}(#{1,6}\s|第[一二三四五六七八九十百零\d]+[章节部分篇]|[一二三四五六七八九十]+、)"
+)
+_SENTENCE_RE = re.compile(r"(?<=[。！？!?；;])|(?<=\n)")
+
+
+class Chunker(Protocol):
+    def split(self, text: str) -> list[str]: ...
+
+
+@dataclass(frozen=True)
+class _Piece:
+    text: str
+    tokens: int
+    block_start: bool
+    heading: bool
+
+
+@dataclass(frozen=True)
+class TokenChunker:
+    max_tokens: int = 1500
+    overlap_tokens: int = 0
+    count_tokens: Callable[[str], int] = field(default=estimate_tokens)
+
+    def split(self, text: str) -> list[str]:
+        if not text.strip():
+            return []
+        if self.count_tokens(text) <= self.max_tokens:
+            return [text]
+        pieces: list[_Piece] = []
+        for block in _split_blocks(text):
+            pieces.extend(self._split_block(block))
+        return self._pack(pieces)
+
+    def _split_block(self, block: str) -> list[_Piece]:
+        heading = bool(_HEADING_RE.match(block))
+        tokens = self.count_tokens(block)
+        if tokens <= self.max_tokens:
+            return [_Piece(text=block, tokens=tokens, block_start=True, heading=heading)]
+        out: list[_Piece] = []
+        for sentence in _split_sentences(block):
+            for part in self._hard_split(sentence):
+                out.append(
+                    _Piece(
+                        text=part,
+                        tokens=self.count_tokens(part),
+                        block_start=not out,
+                        heading=heading and not out,
+                    )
+                )
+        return out
+
+    def _hard_split(self, sentence: str) -> list[str]:
+        tokens = self.count_tokens(sentence)
+        if tokens <= self.max_tokens:
+            return [sentence]
+        step = max(1, len(sentence) * self.max_tokens // tokens)
+        out: list[str] = []
+        start = 0
+        while start < len(sentence):
+            end = min(len(sentence), start + step)
+            while end - start > 1 and self.count_tokens(sentence[start:end]) > self.max_tokens:
+                end = start + (end - start) * 9 // 10
+            out.append(sentence[start:end])
+            start = end
+        return out
+
+    def _pack(self, pieces: list[_Piece]) -> list[str]:
+        separator = self.count_tokens("\n\n")
+        out: list[str] = []
+        buf: list[_Piece] = []
+        size = 0
+        fresh = 0
+        for piece in pieces:
+            cost = piece.tokens + (separator if buf and piece.block_start else 0)
+            over_budget = size + cost > self.max_tokens
+            at_heading = piece.heading and size >= self.max_tokens // 3
+            at_anchor = (
+                piece.block_start
+                and buf
+                and size >= self.max_tokens // 2
+                and self._is_anchor(buf[-1])
+            )
+            if fresh and (over_budget or at_heading or at_anchor):
+                out.append(_join(buf))
+                buf = [] if piece.heading else self._overlap(buf)
+                size = self._size(buf, separator)
+                fresh = 0
+                while buf and size + piece.tokens + separator > self.max_tokens:
+                    buf.pop(0)
+                    size = self._size(buf, separator)
+                cost = piece.tokens + (separator if buf and piece.block_start else 0)
+            buf.append(piece)
+            size += cost
+            fresh += 1
+        if fresh:
+            out.append(_join(buf))
+        return out
+
+    def _is_anchor(self, piece: _Piece) -> bool:
+        # Content-defined cut point: whether a block may end a chunk depends only on
+        # its own text, so boundaries after an edit line up with the previous version.
+        digest = hashlib.blake2b(piece.text.encode("utf-8"), digest_size=8).digest()
+        chance = piece.tokens / max(1, self.max_tokens // 2)
+        return int.from_bytes(digest, "big") < chance * (1 << 64)
+
+    def _size(self, buf: list[_Piece], separator: int) -> int:
+        return sum(p.tokens + (separator if i and p.block_start else 0) for i, p in enumerate(buf))
+
+    def _overlap(self, buf: list[_Piece]) -> list[_Piece]:
+        if self.overlap_tokens <= 0:
+            return []
+        tail: list[_Piece] = []
+        size = 0
+        for piece in reversed(buf):
+            if size + piece.tokens > self.overlap_tokens:
+                break
+            tail.insert(0, piece)
+            size += piece.tokens
+        return tail
+
+
+def _split_blocks(text: str) -> list[str]:
+    blocks: list[str] = []
+    lines: list[str] = []
+    for line in text.splitlines():
+        if not line.strip():
+            if lines:
+                blocks.append("\n".join(lines))
+                lines = []
+            continue
+        if lines and _HEADING_RE.match(line):
+            blocks.append("\n".join(lines))
+            lines = []
+        lines.append(line)
+    if lines:
+        blocks.append("\n".join(lines))
+    return blocks
+
+
+def _split_sentences(block: str) -> list[str]:
+    return [s for s in _SENTENCE_RE.split(block) if s]
+
+
+def _join(pieces: list[_Piece]) -> str:
+    out: list[str] = []
+    for idx, piece in enumerate(pieces):
+        if idx and piece.block_start:
+            out.append("\n\n")
+        out.append(piece.text)
+    return "".join(out)
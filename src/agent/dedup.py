@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import hashlib
+import random
+import re
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def _shingles(text: str, size: int) -> set[bytes]:
+    normalized = _WHITESPACE_RE.sub(" ", text).strip().lower()
+    if len(normalized) <= size:
+        return {normalized.encode("utf-8")}
+    return {
+        normalized[i : i + size].encode("utf-8")
+        for i in range(len(normalized) - size + 1)
+    }
+
+
+class MinHashIndex:
+    def __init__(
+        self,
+        threshold: float = 0.9,
+        num_perm: int = 64,
+        bands: int = 16,
+        shingle_size: int = 5,
+        seed: int = 1,
+    ) -> None:
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self._threshold = threshold
+        self._num_perm = num_perm
+        self._bands = bands
+        self._rows = num_perm // bands
+        self._shingle_size = shingle_size
+        rng = random.Random(seed)
+        self._perms = [
+            (rng.randint(1, _MERSENNE_PRIME - 1), rng.randint(0, _MERSENNE_PRIME - 1))
+            for _ in range(num_perm)
+        ]
+        self._signatures: dict[int, tuple[int, ...]] = {}
+        self._buckets: dict[tuple[int, tuple[int, ...]], list[int]] = {}
+
+    def signature(self, text: str) -> tuple[int, ...]:
+        hashes = [
+            int.from_bytes(hashlib.blake2b(s, digest_size=4).digest(), "little")
+            for s in _shingles(text, self._shingle_size)
+        ]
+        return tuple(
+            min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes)
+            for a, b in self._perms
+        )
+
+    def similarity(self, a: tuple[int, ...], b: tuple[int, ...]) -> float:
+        return sum(1 for x, y in zip(a, b, strict=True) if x == y) / self._num_perm
+
+    def add(self, key: int, text: str) -> int | None:
+        sig = self.signature(text)
+        bands = [
+            (band, sig[band * self._rows : (band + 1) * self._rows])
+            for band in range(self._bands)
+        ]
+        candidates: list[int] = []
+        for band_key in bands:
+            for other in self._buckets.get(band_key, []):
+                if other not in candidates:
+                    candidates.append(other)
+        for other in candidates:
+            if self.similarity(sig, self._signatures[other]) >= self._threshold:
+                return other
+        self._signatures[key] = sig
+        for band_key in bands:
+            self._buckets.setdefault(band_key, []).append(key)
+        return None
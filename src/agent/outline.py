@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+
+_MD_HEADING_RE = re.compile(r"^\s{0,3}(#{1,6})\s+(.+?)\s*#*\s*$")
+_CN_CHAPTER_RE = re.compile(r"^\s*(第[一二三四五六七八九十百零\d]+[章节部分篇])\s*(.*)$")
+_CN_ITEM_RE = re.compile(r"^\s*([一二三四五六七八九十]+、)\s*(.+)$")
+_NUMBERED_RE = re.compile(r"^\s*(\d+(?:\.\d+){1,4}\.?|\d+、|\d+(?=\s))\s*(\S.{0,60})$")
+_TABLE_RE = re.compile(r"<table\b|^\s*\|?\s*:?-{3,}:?\s*\|", re.IGNORECASE | re.MULTILINE)
+
+
+@dataclass(frozen=True)
+class OutlineSection:
+    level: int
+    title: str
+    start: int
+    end: int
+    tables: int
+
+    @property
+    def chars(self) -> int:
+        return self.end - self.start
+
+
+@dataclass(frozen=True)
+class DocumentOutline:
+    sections: tuple[OutlineSection, ...]
+    length: int
+
+    def section_at(self, offset: int) -> OutlineSection | None:
+        found: OutlineSection | None = None
+        for section in self.sections:
+            if section.start > offset:
+                break
+            if offset < section.end:
+                found = section
+        return found
+
+    def render(self, max_chars: int) -> str:
+        levels = sorted({s.level for s in self.sections})
+        while True:
+            lines = [
+                f"{'  ' * max(0, s.level - 1)}- {s.title or '(untitled)'} "
+                f"[@{s.start}, {s.chars} chars, {s.tables} tables]"
+                for s in self.sections
+                if s.level in levels
+            ]
+            text = "\n".join(lines)
+            if len(text) <= max_chars or len(levels) <= 1:
+                break
+            levels.pop()
+        if len(text) <= max_chars:
+            return text
+        kept: list[str] = []
+        size = 0
+        for line in lines:
+            if size + len(line) + 1 > max_chars - 40:
+                break
+            kept.append(line)
+            size += len(line) + 1
+        kept.append(f"... ({len(lines) - len(kept)} more sections)")
+        return "\n".join(kept)
+
+    def sample(self, document: str, max_chars: int) -> str:
+        if len(document) <= max_chars:
+            return document
+        top = [s for s in self.sections if s.level == min(x.level for x in self.sections)]
+        per_section = max(1, max_chars // max(1, len(top)))
+        parts: list[str] = []
+        size = 0
+        for section in top:
+            take = min(per_section, section.chars, max_chars - size)
+            if take <= 0:
+                break
+            parts.append(document[section.start : section.start + take])
+            size += take
+        return "\n...\n".join(parts)
+
+
+def build_outline(markdown: str) -> DocumentOutline:
+    headings: list[tuple[int, str, int]] = []
+    offset = 0
+    for line in markdown.splitlines(keepends=True):
+        heading = _match_heading(line)
+        if heading is not None:
+            headings.append((heading[0], heading[1], offset))
+        offset += len(line)
+
+    if not headings or headings[0][2] > 0:
+        headings.insert(0, (min((h[0] for h in headings), default=1), "", 0))
+
+    sections: list[OutlineSection] = []
+    for idx, (level, title, start) in enumerate(headings):
+        end = len(markdown)
+        for next_level, _title, next_start in headings[idx + 1 :]:
+            if next_level <= level:
+                end = next_start
+                break
+        body_end = headings[idx + 1][2] if idx + 1 < len(headings) else len(markdown)
+        tables = len(_TABLE_RE.findall(markdown[start:body_end]))
+        sections.append(
+            OutlineSection(level=level, title=title, start=start, end=end, tables=tables)
+        )
+    return DocumentOutline(sections=tuple(sections), length=len(markdown))
+
+
+def _match_heading(line: str) -> tuple[int, str] | None:
+    m = _MD_HEADING_RE.match(line)
+    if m:
+        return (len(m.group(1)), m.group(2).strip())
+    m = _CN_CHAPTER_RE.match(line)
+    if m:
+        return (1, f"{m.group(1)} {m.group(2)}".strip())
+    m = _CN_ITEM_RE.match(line)
+    if m:
+        return (2, f"{m.group(1)}{m.group(2).strip()}")
+    m = _NUMBERED_RE.match(line)
+    if m and not m.group(2).rstrip().endswith(("。", "；", ";", "，", ",")):
+        number = m.group(1).rstrip(".、")
+        return (number.count(".") + 1, f"{number} {m.group(2).strip()}")
+    return None
@@ -1,15 +1,25 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import json
-from collections.abc import Awaitable, Callable
-from dataclasses import dataclass
-
-from langchain_core.messages import HumanMessage, SystemMessage
+import time
+from collections.abc import AsyncIterable, AsyncIterator, Awaitable, Callable
+from dataclasses import dataclass, field, replace
+from functools import partial
 
+from src.agent.budget import ExecutionBudget, LatencyStats, outline_plan_titles, plan_budget
+from src.agent.chunker import Chunker, TokenChunker
+from src.agent.dedup import MinHashIndex
+from src.agent.outline import DocumentOutline, build_outline
 from src.models.enums import Mode
 from src.models.events import EventType
 from src.models.provider import ChatModel
-from src.prompt.registry import get_prompt_text
+from src.models.router import ModelRouter
+from src.models.usage import UsageTracker, track_usage, usage_stage
+from src.prompt.assembly import PromptLayout
+from src.prompt.registry import get_prompt
+from src.utils.tokens import estimate_tokens
 
 
 @dataclass(frozen=True)
@@ -18,10 +28,51 @@ class PlanItem:
     title: str
 
 
+@dataclass(frozen=True)
+class ChunkResult:
+    covered: list[str]
+    markdown: str
+
+
+@dataclass
+class ReviewRecord:
+    mode: Mode | None = None
+    plan: list[PlanItem] = field(default_factory=list)
+    chunks: dict[str, ChunkResult] = field(default_factory=dict)
+    reviewed: int = 0
+    reused: int = 0
+    deduplicated: int = 0
+    partial: bool = False
+
+
+@dataclass
+class _RunContext:
+    mode: Mode
+    layout: PromptLayout
+    emit: Callable[[EventType, str], Awaitable[None]]
+    should_cancel: Callable[[], bool]
+    record: ReviewRecord
+    previous: ReviewRecord | None
+    on_token: Callable[[str], Awaitable[None]] | None
+    semaphore: asyncio.Semaphore
+    budget: ExecutionBudget | None = None
+
+
 @dataclass(frozen=True)
 class ReviewService:
     model: ChatModel
     max_chars_per_chunk: int = 3000
+    max_concurrency: int = 1
+    chunker: Chunker | None = None
+    max_findings_tokens: int = 12000
+    max_reduce_levels: int = 3
+    plan_outline_chars: int = 3000
+    plan_sample_chars: int = 3000
+    stream_plan_chars: int = 6000
+    dedup_threshold: float | None = None
+    latency: LatencyStats | None = None
+    max_budget_concurrency: int = 8
+    router: ModelRouter | None = None
 
     async def review(
         self,
@@ -30,59 +81,382 @@ class ReviewService:
         document: str,
         emit: Callable[[EventType, str], Awaitable[None]] | None = None,
         should_cancel: Callable[[], bool] | None = None,
+        record: ReviewRecord | None = None,
+        previous: ReviewRecord | None = None,
+        on_token: Callable[[str], Awaitable[None]] | None = None,
+        time_budget_s: float | None = None,
+        started_at: float | None = None,
     ) -> str:
-        async def _noop_emit(_type: EventType, _message: str) -> None:
-            return
+        budget = self._budget(document, time_budget_s, started_at)
+        ctx = self._context(
+            mode,
+            language,
+            emit,
+            should_cancel,
+            record,
+            previous,
+            on_token,
+            semaphore=asyncio.Semaphore(budget.concurrency) if budget is not None else None,
+            budget=budget,
+        )
+        with track_usage() as usage:
+            plan = await self._plan_and_announce(ctx, document)
+            chunks = self._chunk(document, self._budget_chunker(budget))
+            result = await self._execute_and_finalize(
+                ctx, plan, _iterate(chunks), len(chunks)
+            )
+        await _emit_usage(ctx, usage)
+        return result
 
-        def _never_cancel() -> bool:
-            return False
+    async def review_many(
+        self,
+        modes: list[Mode],
+        language: str,
+        document: str,
+        emit: Callable[[Mode, EventType, str], Awaitable[None]] | None = None,
+        should_cancel: Callable[[], bool] | None = None,
+        records: dict[Mode, ReviewRecord] | None = None,
+        on_token: Callable[[Mode, str], Awaitable[None]] | None = None,
+        time_budget_s: float | None = None,
+        started_at: float | None = None,
+    ) -> dict[Mode, str]:
+        budget = self._budget(document, time_budget_s, started_at)
+        semaphore = asyncio.Semaphore(
+            budget.concurrency if budget is not None else max(1, self.max_concurrency)
+        )
+        contexts = [
+            self._context(
+                mode,
+                language,
+                partial(emit, mode) if emit is not None else None,
+                should_cancel,
+                records.setdefault(mode, ReviewRecord()) if records is not None else None,
+                None,
+                partial(on_token, mode) if on_token is not None else None,
+                semaphore=semaphore,
+                budget=budget,
+            )
+            for mode in dict.fromkeys(modes)
+        ]
+        chunks = self._chunk(document, self._budget_chunker(budget))
 
-        emit_ = emit or _noop_emit
-        should_cancel_ = should_cancel or _never_cancel
-        prompt = get_prompt_text(mode)
-        await emit_(EventType.info, "planning")
-        plan = await self._plan(system_prompt=prompt, language=language, document=document)
-        plan_by_id = {p.id: p for p in plan}
-        completed: set[str] = set()
+        async def _one(ctx: _RunContext) -> str:
+            plan = await self._plan_and_announce(ctx, document)
+            return await self._execute_and_finalize(ctx, plan, _iterate(chunks), len(chunks))
+
+        with track_usage() as usage:
+            tasks = [asyncio.create_task(_one(ctx)) for ctx in contexts]
+            try:
+                results = await asyncio.gather(*tasks)
+            except BaseException:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                raise
+        if contexts:
+            await _emit_usage(contexts[0], usage)
+        return {ctx.mode: result for ctx, result in zip(contexts, results, strict=True)}
+
+    async def review_stream(
+        self,
+        mode: Mode,
+        language: str,
+        segments: AsyncIterable[str],
+        emit: Callable[[EventType, str], Awaitable[None]] | None = None,
+        should_cancel: Callable[[], bool] | None = None,
+        record: ReviewRecord | None = None,
+        previous: ReviewRecord | None = None,
+        on_token: Callable[[str], Awaitable[None]] | None = None,
+    ) -> str:
+        ctx = self._context(mode, language, emit, should_cancel, record, previous, on_token)
+        with track_usage() as usage:
+            result = await self._review_segments(ctx, segments)
+        await _emit_usage(ctx, usage)
+        return result
+
+    async def _review_segments(self, ctx: _RunContext, segments: AsyncIterable[str]) -> str:
+        source = aiter(segments)
+        head: list[str] = []
+        size = 0
+        exhausted = False
+        while size < self.stream_plan_chars:
+            try:
+                segment = await anext(source)
+            except StopAsyncIteration:
+                exhausted = True
+                break
+            head.append(segment)
+            size += len(segment)
+        received = "".join(head)
+        if not received.strip() and exhausted:
+            raise ValueError("document is empty")
+        plan = await self._plan_and_announce(ctx, received)
+
+        async def _chunks() -> AsyncIterator[str]:
+            pending = received
+            if not exhausted:
+                async for segment in source:
+                    if pending and not pending.endswith("\n"):
+                        pending += "\n"
+                    pending += segment
+                    ready = self._chunk(pending)
+                    if len(ready) > 1:
+                        for chunk in ready[:-1]:
+                            yield chunk
+                        pending = ready[-1]
+            if pending.strip():
+                for chunk in self._chunk(pending):
+                    yield chunk
+
+        return await self._execute_and_finalize(ctx, plan, _chunks(), None)
+
+    def _context(
+        self,
+        mode: Mode,
+        language: str,
+        emit: Callable[[EventType, str], Awaitable[None]] | None,
+        should_cancel: Callable[[], bool] | None,
+        record: ReviewRecord | None,
+        previous: ReviewRecord | None,
+        on_token: Callable[[str], Awaitable[None]] | None,
+        semaphore: asyncio.Semaphore | None = None,
+        budget: ExecutionBudget | None = None,
+    ) -> _RunContext:
+        prompt = get_prompt(mode)
+        if record is None:
+            record = ReviewRecord()
+        record.mode = mode
+        return _RunContext(
+            mode=mode,
+            layout=PromptLayout(
+                system_prompt=prompt.text, language=language, prompt_id=prompt.identity
+            ),
+            emit=emit or _noop_emit,
+            should_cancel=should_cancel or _never_cancel,
+            record=record,
+            previous=previous,
+            on_token=on_token,
+            semaphore=semaphore or asyncio.Semaphore(max(1, self.max_concurrency)),
+            budget=budget,
+        )
+
+    def _budget(
+        self, document: str, time_budget_s: float | None, started_at: float | None
+    ) -> ExecutionBudget | None:
+        if time_budget_s is None:
+            return None
+        chunk_tokens = (
+            self.chunker.max_tokens
+            if isinstance(self.chunker, TokenChunker)
+            else estimate_tokens(document[: self.max_chars_per_chunk])
+        )
+        return plan_budget(
+            time_budget_s=time_budget_s,
+            document_tokens=estimate_tokens(document),
+            chunk_tokens=max(1, chunk_tokens),
+            max_concurrency=self.max_concurrency,
+            max_budget_concurrency=self.max_budget_concurrency,
+            latency=self.latency or LatencyStats(),
+            now=started_at if started_at is not None else time.monotonic(),
+        )
+
+    def _budget_chunker(self, budget: ExecutionBudget | None) -> Chunker | None:
+        if budget is None or not isinstance(self.chunker, TokenChunker):
+            return None
+        return replace(self.chunker, max_tokens=budget.chunk_tokens)
+
+    def _model(self, mode: Mode, stage: str) -> ChatModel:
+        if self.router is None:
+            return self.model
+        return self.router.resolve(mode, stage)
+
+    def _observe(self, stage: str, started: float) -> None:
+        if self.latency is not None:
+            self.latency.observe(stage, time.perf_counter() - started)
+
+    async def _plan_and_announce(self, ctx: _RunContext, document: str) -> list[PlanItem]:
+        await ctx.emit(EventType.info, "planning")
+        outline = build_outline(document)
+        previous = ctx.previous
+        if previous is not None and previous.plan and previous.mode == ctx.mode:
+            plan = list(previous.plan)
+        elif ctx.budget is not None and ctx.budget.skip_planning:
+            titles = outline_plan_titles(outline) or ["整体评审"]
+            plan = [PlanItem(id=f"T{idx}", title=t) for idx, t in enumerate(titles, start=1)]
+        else:
+            started = time.perf_counter()
+            with usage_stage("planning"):
+                plan = await self._plan(
+                    model=self._model(ctx.mode, "plan"),
+                    layout=ctx.layout,
+                    document=document,
+                    outline=outline,
+                )
+            self._observe("plan", started)
+        ctx.record.plan = plan
         for plan_item in plan:
-            await emit_(EventType.todo, f"[pending] {plan_item.id} {plan_item.title}")
-        if should_cancel_():
+            await ctx.emit(EventType.todo, f"[pending] {plan_item.id} {plan_item.title}")
+        if ctx.should_cancel():
+            raise ValueError("canceled")
+        return plan
+
+    async def _execute_and_finalize(
+        self,
+        ctx: _RunContext,
+        plan: list[PlanItem],
+        chunks: AsyncIterable[str],
+        chunk_count: int | None,
+    ) -> str:
+        with usage_stage("executing"):
+            partials, completed = await self._execute_chunks(ctx, plan, chunks, chunk_count)
+        reviewed_chunks = len(partials)
+        if ctx.should_cancel():
             raise ValueError("canceled")
-        chunks = self._chunk(document)
-        partials: list[str] = []
-        for idx, chunk in enumerate(chunks):
-            if should_cancel_():
-                raise ValueError("canceled")
-            await emit_(EventType.info, f"executing {idx + 1}/{len(chunks)}")
-            covered_ids, markdown = await self._review_chunk(
-                system_prompt=prompt,
-                language=language,
+        await ctx.emit(EventType.info, "producing")
+        layout = ctx.layout.with_plan(_plan_text(plan))
+        with usage_stage("merging"):
+            partials = await self._reduce(
+                model=self._model(ctx.mode, "merge"),
+                layout=layout,
+                partials=partials,
+                emit=ctx.emit,
+                semaphore=ctx.semaphore,
+            )
+        notice = ""
+        if ctx.record.partial:
+            notice = (
+                f"> 注意：受时间预算限制，本报告仅基于已完成的 {reviewed_chunks} 个片段生成，"
+                "结果不完整。\n\n"
+            )
+            if ctx.on_token is not None:
+                await ctx.on_token(notice)
+        started = time.perf_counter()
+        with usage_stage("producing"):
+            result = await self._finalize(
+                model=self._model(ctx.mode, "final"),
+                layout=layout,
                 plan=plan,
-                chunk=chunk,
-                chunk_index=idx + 1,
-                chunk_count=len(chunks),
+                completed=completed,
+                partials=partials,
+                on_token=ctx.on_token,
             )
-            partials.append(markdown)
-            for cid in covered_ids:
+        self._observe("final", started)
+        return notice + result
+
+    async def _execute_chunks(
+        self,
+        ctx: _RunContext,
+        plan: list[PlanItem],
+        chunks: AsyncIterable[str],
+        chunk_count: int | None,
+    ) -> tuple[list[str], set[str]]:
+        plan_by_id = {p.id: p for p in plan}
+        completed: set[str] = set()
+        partials: dict[int, str] = {}
+        total = f"/{chunk_count}" if chunk_count is not None else ""
+        layout = ctx.layout.with_plan(_plan_text(plan))
+        model = self._model(ctx.mode, "chunk")
+        index = MinHashIndex(self.dedup_threshold) if self.dedup_threshold is not None else None
+        keys: dict[int, str] = {}
+        duplicates: dict[int, list[int]] = {}
+
+        async def _run(idx: int, key: str, chunk: str) -> None:
+            result = ctx.previous.chunks.get(key) if ctx.previous is not None else None
+            if result is not None:
+                ctx.record.reused += 1
+            else:
+                async with ctx.semaphore:
+                    if ctx.should_cancel():
+                        raise ValueError("canceled")
+                    await ctx.emit(EventType.info, f"executing {idx + 1}{total}")
+                    started = time.perf_counter()
+                    covered_ids, markdown = await self._review_chunk(
+                        model=model,
+                        layout=layout,
+                        chunk=chunk,
+                        chunk_index=idx + 1,
+                        chunk_count=chunk_count,
+                    )
+                    self._observe("chunk", started)
+                result = ChunkResult(covered=covered_ids, markdown=markdown)
+                ctx.record.reviewed += 1
+            ctx.record.chunks[key] = result
+            partials[idx] = result.markdown
+            for cid in result.covered:
                 if cid in completed:
                     continue
                 done_item = plan_by_id.get(cid)
                 if not done_item:
                     continue
                 completed.add(cid)
-                await emit_(EventType.todo, f"[done] {done_item.id} {done_item.title}")
-        if should_cancel_():
-            raise ValueError("canceled")
-        await emit_(EventType.info, "producing")
-        return await self._finalize(
-            system_prompt=prompt,
-            language=language,
-            plan=plan,
-            completed=completed,
-            partials=partials,
+                await ctx.emit(EventType.todo, f"[done] {done_item.id} {done_item.title}")
+
+        tasks: list[asyncio.Task[None]] = []
+        cutoff = (
+            ctx.budget.deadline - ctx.budget.finalize_reserve if ctx.budget is not None else None
         )
+        first_wave = ctx.budget.concurrency if ctx.budget is not None else 0
+        try:
+            async for chunk in chunks:
+                if ctx.should_cancel():
+                    raise ValueError("canceled")
+                if cutoff is not None and len(tasks) >= first_wave and time.monotonic() >= cutoff:
+                    ctx.record.partial = True
+                    break
+                idx = len(keys)
+                keys[idx] = _chunk_key(ctx.mode, layout, chunk)
+                same = index.add(idx, chunk) if index is not None else None
+                if same is not None:
+                    duplicates.setdefault(same, []).append(idx)
+                    ctx.record.deduplicated += 1
+                    continue
+                tasks.append(asyncio.create_task(_run(idx, keys[idx], chunk)))
+            if cutoff is None or not tasks:
+                await asyncio.gather(*tasks)
+            else:
+                _, pending = await asyncio.wait(
+                    tasks, timeout=max(0.0, cutoff - time.monotonic())
+                )
+                if len(pending) == len(tasks):
+                    _, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                if pending:
+                    ctx.record.partial = True
+                    for task in pending:
+                        task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                for task in tasks:
+                    if not task.cancelled():
+                        task.result()
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        for same, idxs in duplicates.items():
+            if same not in partials:
+                continue
+            for idx in idxs:
+                ctx.record.chunks[keys[idx]] = ctx.record.chunks[keys[same]]
+            locations = ", ".join([str(same + 1), *[str(idx + 1) for idx in idxs]])
+            partials[same] += f"\n\n（以上发现同样适用于内容重复的片段 {locations}）"
+        if ctx.previous is not None:
+            await ctx.emit(EventType.info, f"reused {ctx.record.reused}/{len(keys)} chunks")
+        if ctx.record.partial:
+            await ctx.emit(
+                EventType.info,
+                f"deadline reached {len(partials)}/{len(keys)} chunks",
+            )
+        if ctx.record.deduplicated:
+            await ctx.emit(
+                EventType.info,
+                f"deduplicated {ctx.record.deduplicated}/{len(keys)} chunks",
+            )
+        return [partials[idx] for idx in sorted(partials)], completed
 
-    def _chunk(self, text: str) -> list[str]:
+    def _chunk(self, text: str, chunker: Chunker | None = None) -> list[str]:
+        chunker = chunker or self.chunker
+        if chunker is not None:
+            return chunker.split(text) or [text]
         if len(text) <= self.max_chars_per_chunk:
             return [text]
         parts = text.split("\n\n")
@@ -116,19 +490,25 @@ class ReviewService:
             out.append("\n\n".join(buf))
         return out
 
-    async def _plan(self, system_prompt: str, language: str, document: str) -> list[PlanItem]:
-        system = SystemMessage(
-            content=(
-                f"{system_prompt}\n\n"
-                "你现在的任务是先为后续评审生成一个计划列表。"
-                "请根据输入文档，输出一个 JSON 数组。"
-                "数组元素为对象：{\"id\":\"T1\",\"title\":\"...\"}。"
-                "id 必须唯一且简短（如 T1/T2）。title 为简短评审待办。"
-                "只输出 JSON，不要输出其它内容。"
-            )
+    async def _plan(
+        self,
+        model: ChatModel,
+        layout: PromptLayout,
+        document: str,
+        outline: DocumentOutline,
+    ) -> list[PlanItem]:
+        messages = layout.messages(
+            "你现在的任务是先为后续评审生成一个计划列表。"
+            "输入包含整篇文档的章节大纲（标题、偏移、字数、表格数）和按章节抽取的片段，"
+            "请让计划覆盖整篇文档的所有章节。"
+            "请根据输入文档，输出一个 JSON 数组。"
+            "数组元素为对象：{\"id\":\"T1\",\"title\":\"...\"}。"
+            "id 必须唯一且简短（如 T1/T2）。title 为简短评审待办。"
+            "只输出 JSON，不要输出其它内容。\n\n"
+            f"Outline:\n{outline.render(self.plan_outline_chars)}\n\n"
+            f"Document:\n{outline.sample(document, self.plan_sample_chars)}"
         )
-        human = HumanMessage(content=f"Language: {language}\n\nDocument:\n{document[:6000]}")
-        result = await self.model.ainvoke([system, human])
+        result = await model.ainvoke(messages)
         content = getattr(result, "content", "")
         if not isinstance(content, str):
             content = str(content)
@@ -155,26 +535,20 @@ class ReviewService:
 
     async def _review_chunk(
         self,
-        system_prompt: str,
-        language: str,
-        plan: list[PlanItem],
+        model: ChatModel,
+        layout: PromptLayout,
         chunk: str,
         chunk_index: int,
-        chunk_count: int,
+        chunk_count: int | None,
     ) -> tuple[list[str], str]:
-        plan_text = "\n".join([f"- {p.id} {p.title}" for p in plan])
-        system = SystemMessage(content=f"{system_prompt}\n\nLanguage: {language}")
-        human = HumanMessage(
-            content=(
-                f"这是文档的一部分（{chunk_index}/{chunk_count}）。"
-                "以下是整体评审待办列表，请重点围绕这些待办在当前片段中发现问题与建议。"
-                "请只输出 JSON：{\"covered\":[\"T1\"],\"markdown\":\"...\"}。"
-                "covered 为你在本片段中实际覆盖到的待办 id 列表。markdown 为本片段发现。\n\n"
-                f"Todo:\n{plan_text}\n\n"
-                f"Content:\n{chunk}"
-            )
+        messages = layout.messages(
+            "以上是整体评审待办列表，请重点围绕这些待办在当前片段中发现问题与建议。"
+            "请只输出 JSON：{\"covered\":[\"T1\"],\"markdown\":\"...\"}。"
+            "covered 为你在本片段中实际覆盖到的待办 id 列表。markdown 为本片段发现。\n\n"
+            f"这是文档的一部分（{chunk_index}/{chunk_count or '?'}）。\n\n"
+            f"Content:\n{chunk}"
         )
-        result = await self.model.ainvoke([system, human])
+        result = await model.ainvoke(messages)
         content = getattr(result, "content", "")
         if not isinstance(content, str):
             return ([], str(result))
@@ -193,32 +567,129 @@ class ReviewService:
             pass
         return ([], content)
 
+    async def _reduce(
+        self,
+        model: ChatModel,
+        layout: PromptLayout,
+        partials: list[str],
+        emit: Callable[[EventType, str], Awaitable[None]],
+        semaphore: asyncio.Semaphore,
+    ) -> list[str]:
+        findings = [p for p in partials if p.strip()]
+
+        async def _run(batch: list[str]) -> str:
+            if len(batch) == 1 and estimate_tokens(batch[0]) <= self.max_findings_tokens:
+                return batch[0]
+            async with semaphore:
+                return await self._merge(model=model, layout=layout, findings=batch)
+
+        for _ in range(self.max_reduce_levels):
+            if len(findings) <= 1:
+                break
+            if estimate_tokens("\n\n".join(findings)) <= self.max_findings_tokens:
+                break
+            batches = _batch_by_tokens(findings, self.max_findings_tokens)
+            await emit(EventType.info, f"merging {len(findings)}->{len(batches)}")
+            findings = list(await asyncio.gather(*[_run(batch) for batch in batches]))
+        return findings
+
+    async def _merge(self, model: ChatModel, layout: PromptLayout, findings: list[str]) -> str:
+        joined = "\n\n".join(findings)
+        messages = layout.messages(
+            "以下是同一文档多个片段的评审发现。请将它们合并为一份 Markdown 发现列表："
+            "合并重复问题，保留每个具体问题、位置与建议，不要遗漏，也不要输出最终报告结构。\n\n"
+            f"Findings:\n{joined}"
+        )
+        result = await model.ainvoke(messages)
+        content = getattr(result, "content", "")
+        if isinstance(content, str):
+            return content
+        return str(result)
+
     async def _finalize(
         self,
-        system_prompt: str,
-        language: str,
+        model: ChatModel,
+        layout: PromptLayout,
         plan: list[PlanItem],
         completed: set[str],
         partials: list[str],
+        on_token: Callable[[str], Awaitable[None]] | None = None,
     ) -> str:
-        system = SystemMessage(content=f"{system_prompt}\n\nLanguage: {language}")
-        plan_text = "\n".join(
-            [
-                f"- [{'x' if p.id in completed else ' '}] {p.id} {p.title}"
-                for p in plan
-            ]
-        )
+        done = ", ".join([p.id for p in plan if p.id in completed]) or "-"
         findings = "\n\n".join(partials)
-        human = HumanMessage(
-            content=(
-                "请基于评审待办和分段发现，输出最终的评审 Markdown。"
-                "必须符合 system prompt 的要求。\n\n"
-                f"Todo:\n{plan_text}\n\n"
-                f"Findings:\n{findings}"
-            )
+        messages = layout.messages(
+            "请基于评审待办和分段发现，输出最终的评审 Markdown。"
+            "必须符合 system prompt 的要求。\n\n"
+            f"Covered: {done}\n\n"
+            f"Findings:\n{findings}"
         )
-        result = await self.model.ainvoke([system, human])
+        astream = getattr(model, "astream", None)
+        if on_token is not None and callable(astream):
+            pieces: list[str] = []
+            async for piece in astream(messages):
+                text = getattr(piece, "content", "")
+                if not isinstance(text, str) or not text:
+                    continue
+                pieces.append(text)
+                await on_token(text)
+            return "".join(pieces)
+        result = await model.ainvoke(messages)
         content = getattr(result, "content", "")
         if isinstance(content, str):
+            if on_token is not None and content:
+                await on_token(content)
             return content
         return str(result)
+
+
+async def _noop_emit(_type: EventType, _message: str) -> None:
+    return
+
+
+def _never_cancel() -> bool:
+    return False
+
+
+async def _emit_usage(ctx: _RunContext, usage: UsageTracker) -> None:
+    if usage.input_tokens <= 0:
+        return
+    await ctx.emit(
+        EventType.info,
+        f"prefix cache {usage.cache_hit_rate:.0%} "
+        f"({usage.cached_tokens}/{usage.input_tokens} prompt tokens, {usage.calls} calls)",
+    )
+
+
+def _plan_text(plan: list[PlanItem]) -> str:
+    return "\n".join([f"- {p.id} {p.title}" for p in plan])
+
+
+def _chunk_key(mode: Mode, layout: PromptLayout, chunk: str) -> str:
+    h = hashlib.sha256()
+    prompt = layout.prompt_id or layout.system_prompt
+    for part in (mode.value, layout.language, prompt, layout.plan or "", chunk):
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+async def _iterate(items: list[str]) -> AsyncIterator[str]:
+    for item in items:
+        yield item
+
+
+def _batch_by_tokens(findings: list[str], max_tokens: int) -> list[list[str]]:
+    batches: list[list[str]] = []
+    buf: list[str] = []
+    size = 0
+    for item in findings:
+        tokens = estimate_tokens(item)
+        if buf and size + tokens > max_tokens:
+            batches.append(buf)
+            buf = []
+            size = 0
+        buf.append(item)
+        size += tokens
+    if buf:
+        batches.append(buf)
+    return batches
@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+import uuid
+
+from src.models.enums import Mode
+from src.models.run import ReviewBatch
+
+
+class InMemoryBatchStore:
+    def __init__(self) -> None:
+        self._batches: dict[str, ReviewBatch] = {}
+
+    def create(self, session_id: str, mode: Mode, run_ids: list[str]) -> ReviewBatch:
+        batch = ReviewBatch(id=uuid.uuid4().hex, session_id=session_id, mode=mode, run_ids=run_ids)
+        self._batches[batch.id] = batch
+        return batch
+
+    def get(self, batch_id: str) -> ReviewBatch | None:
+        return self._batches.get(batch_id)
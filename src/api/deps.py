@@ -2,13 +2,17 @@ from __future__ import annotations
 
 from datetime import timedelta
 
+from src.agent.budget import LatencyStats
 from src.agent.chat_handler import ChatService
+from src.agent.chunker import TokenChunker
 from src.agent.review_handler import ReviewService
+from src.api.batch_store import InMemoryBatchStore
 from src.api.run_store import InMemoryRunStore
+from src.api.scheduler import RunScheduler
 from src.api.session_store import InMemorySessionStore
-from src.config.loader import load_config
+from src.config.loader import get_config_section, load_config
 from src.config.schema import AppConfig
-from src.models.chat_model import init_chat_model
+from src.models.chat_model import init_chat_model, init_model_router
 from src.models.enums import Mode
 from src.models.run import RunStatus
 from src.prompt.registry import get_prompt_text
@@ -19,6 +23,9 @@ from src.utils.storage_paths import get_datas_dir
 _sessions = InMemorySessionStore()
 _runs = InMemoryRunStore()
 _document_parser = DocumentParser()
+_batches = InMemoryBatchStore()
+_scheduler: RunScheduler | None = None
+_latency = LatencyStats()
 
 
 def get_config() -> AppConfig:
@@ -43,13 +50,43 @@ def get_run_store() -> InMemoryRunStore:
     return _runs
 
 
+def get_batch_store() -> InMemoryBatchStore:
+    return _batches
+
+
+def get_run_scheduler() -> RunScheduler:
+    global _scheduler
+    if _scheduler is None:
+        settings = get_config_section(["review"]) or {}
+        _scheduler = RunScheduler(int(settings.get("max_concurrent_runs", 4)))
+    return _scheduler
+
+
 def get_document_parser() -> DocumentParser:
     return _document_parser
 
 
 def get_review_service() -> ReviewService:
     model = init_chat_model()
-    return ReviewService(model=model)
+    router = init_model_router(model)
+    settings = get_config_section(["review"]) or {}
+    return ReviewService(
+        model=model,
+        max_concurrency=int(settings.get("max_concurrency", 1)),
+        chunker=TokenChunker(
+            max_tokens=int(settings.get("chunk_tokens", 1500)),
+            overlap_tokens=int(settings.get("chunk_overlap_tokens", 0)),
+        ),
+        max_findings_tokens=int(settings.get("findings_tokens", 12000)),
+        max_reduce_levels=int(settings.get("max_reduce_levels", 3)),
+        dedup_threshold=(
+            float(settings["dedup_threshold"]) if settings.get("dedup_threshold") else None
+        ),
+        stream_plan_chars=int(settings.get("stream_plan_chars", 6000)),
+        latency=_latency,
+        router=router if router.routes else None,
+        max_budget_concurrency=int(settings.get("budget_max_concurrency", 8)),
+    )
 
 
 def get_run_status_succeeded() -> RunStatus:
@@ -1,28 +1,47 @@
 from __future__ import annotations
 
 import asyncio
+import time
+from collections.abc import AsyncIterator
+from functools import partial
+from pathlib import Path
 
 from fastapi import APIRouter, Depends, HTTPException
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
-from src.agent.review_handler import ReviewService
+from src.agent.review_handler import ReviewRecord, ReviewService
+from src.api.batch_store import InMemoryBatchStore
 from src.api.deps import (
+    get_batch_store,
     get_document_parser,
     get_file_store,
     get_review_service,
+    get_run_scheduler,
     get_run_store,
     get_session_store,
 )
 from src.api.run_store import InMemoryRunStore
+from src.api.scheduler import RunScheduler
 from src.api.session_store import InMemorySessionStore
+from src.models.entities import Session
 from src.models.enums import Mode
 from src.models.events import EventType, RunEvent
-from src.models.run import Run, RunPhase, RunStatus
+from src.models.run import BatchProgress, Run, RunMetrics, RunPhase, RunStatus
+from src.models.usage import track_usage, usage_stage
 from src.utils.document_parser import DocumentParser
-from src.utils.file_store import FileStore
+from src.utils.file_store import FileStore, StoreResult
 
 router = APIRouter(prefix="/api")
 
+_OUTPUT_FLUSH_CHARS = 512
+_OUTPUT_FLUSH_SECONDS = 0.25
+
+_PHASE_BY_MESSAGE = {
+    "planning": RunPhase.planning,
+    "executing": RunPhase.executing,
+    "producing": RunPhase.producing,
+}
+
 
 class CancelRunResponse(BaseModel):
     run_id: str
@@ -34,12 +53,35 @@ class StartReviewBody(BaseModel):
     document_id: str | None = None
     text: str | None = None
     filename: str | None = None
+    stream: bool = False
+    previous_run_id: str | None = None
+    modes: list[Mode] = Field(default_factory=list)
+    time_budget_s: float | None = Field(default=None, gt=0)
 
 
 class StartReviewResponse(BaseModel):
     run_id: str
 
 
+class BatchItem(BaseModel):
+    document_id: str | None = None
+    text: str | None = None
+    filename: str | None = None
+
+
+class StartBatchBody(BaseModel):
+    session_id: str
+    items: list[BatchItem] = Field(min_length=1)
+    stream: bool = False
+    modes: list[Mode] = Field(default_factory=list)
+    time_budget_s: float | None = Field(default=None, gt=0)
+
+
+class StartBatchResponse(BaseModel):
+    batch_id: str
+    run_ids: list[str]
+
+
 @router.get("/runs/{run_id}", response_model=Run)
 async def get_run(run_id: str, store: InMemoryRunStore = Depends(get_run_store)) -> Run:
     """Get run detail.
@@ -57,6 +99,20 @@ async def get_run(run_id: str, store: InMemoryRunStore = Depends(get_run_store))
     return item.run
 
 
+def _get_review_session(sessions: InMemorySessionStore, session_id: str) -> Session:
+    session = sessions.get_session(session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="session not found")
+    if session.mode == Mode.chat:
+        raise HTTPException(status_code=400, detail="chat mode does not support review")
+    return session
+
+
+def _validate_modes(modes: list[Mode]) -> None:
+    if Mode.chat in modes:
+        raise HTTPException(status_code=400, detail="chat mode does not support review")
+
+
 @router.post("/reviews", response_model=StartReviewResponse)
 async def start_review(
     body: StartReviewBody,
@@ -65,6 +121,7 @@ async def start_review(
     file_store: FileStore = Depends(get_file_store),
     parser: DocumentParser = Depends(get_document_parser),
     service: ReviewService = Depends(get_review_service),
+    scheduler: RunScheduler = Depends(get_run_scheduler),
 ) -> StartReviewResponse:
     """Start a review run.
 
@@ -75,59 +132,304 @@ async def start_review(
         Run metadata.
     """
 
-    session = sessions.get_session(body.session_id)
-    if not session:
-        raise HTTPException(status_code=404, detail="session not found")
-    if session.mode == Mode.chat:
-        raise HTTPException(status_code=400, detail="chat mode does not support review")
+    session = _get_review_session(sessions, body.session_id)
+    _validate_modes(body.modes)
+
+    previous: ReviewRecord | None = None
+    if body.previous_run_id:
+        if len(body.modes) > 1:
+            raise HTTPException(
+                status_code=400, detail="previous_run_id does not support multiple modes"
+            )
+        previous_item = store.get(body.previous_run_id)
+        if not previous_item or previous_item.review_record is None:
+            raise HTTPException(status_code=404, detail="previous run not found")
+        if previous_item.run.mode != (body.modes or [session.mode])[0]:
+            raise HTTPException(status_code=400, detail="previous run mode does not match")
+        previous = previous_item.review_record
+
+    run = _launch_review(
+        session=session,
+        document_id=body.document_id,
+        text=body.text,
+        filename=body.filename,
+        stream=body.stream,
+        previous=previous,
+        store=store,
+        file_store=file_store,
+        parser=parser,
+        service=service,
+        scheduler=scheduler,
+        modes=body.modes,
+        time_budget_s=body.time_budget_s,
+    )
+    return StartReviewResponse(run_id=run.id)
+
+
+@router.post("/review-batches", response_model=StartBatchResponse)
+async def start_review_batch(
+    body: StartBatchBody,
+    sessions: InMemorySessionStore = Depends(get_session_store),
+    store: InMemoryRunStore = Depends(get_run_store),
+    batches: InMemoryBatchStore = Depends(get_batch_store),
+    file_store: FileStore = Depends(get_file_store),
+    parser: DocumentParser = Depends(get_document_parser),
+    service: ReviewService = Depends(get_review_service),
+    scheduler: RunScheduler = Depends(get_run_scheduler),
+) -> StartBatchResponse:
+    """Start review runs for many documents through the shared scheduler.
+
+    Args:
+        body: Batch review request.
+
+    Returns:
+        Batch metadata.
+    """
+
+    session = _get_review_session(sessions, body.session_id)
+    _validate_modes(body.modes)
+    run_ids: list[str] = []
+    for item in body.items:
+        run = _launch_review(
+            session=session,
+            document_id=item.document_id,
+            text=item.text,
+            filename=item.filename,
+            stream=body.stream,
+            previous=None,
+            store=store,
+            file_store=file_store,
+            parser=parser,
+            service=service,
+            scheduler=scheduler,
+            modes=body.modes,
+            time_budget_s=body.time_budget_s,
+        )
+        run_ids.append(run.id)
+    batch = batches.create(session_id=session.id, mode=session.mode, run_ids=run_ids)
+    return StartBatchResponse(batch_id=batch.id, run_ids=run_ids)
+
+
+@router.get("/review-batches/{batch_id}", response_model=BatchProgress)
+async def get_review_batch(
+    batch_id: str,
+    batches: InMemoryBatchStore = Depends(get_batch_store),
+    store: InMemoryRunStore = Depends(get_run_store),
+) -> BatchProgress:
+    """Get aggregated progress of a review batch.
+
+    Args:
+        batch_id: Batch identifier.
 
-    run = store.create(session_id=session.id, mode=session.mode, document_id=body.document_id)
+    Returns:
+        Batch progress.
+    """
+
+    batch = batches.get(batch_id)
+    if not batch:
+        raise HTTPException(status_code=404, detail="batch not found")
+    runs = [item.run for run_id in batch.run_ids if (item := store.get(run_id))]
+    counts = {status: 0 for status in RunStatus}
+    for run in runs:
+        counts[run.status] += 1
+    queued = sum(
+        1 for r in runs if r.status == RunStatus.running and r.phase == RunPhase.received
+    )
+    if counts[RunStatus.running]:
+        status = RunStatus.running
+    elif counts[RunStatus.succeeded] == len(runs):
+        status = RunStatus.succeeded
+    elif counts[RunStatus.canceled] == len(runs):
+        status = RunStatus.canceled
+    else:
+        status = RunStatus.failed
+    return BatchProgress(
+        batch_id=batch.id,
+        status=status,
+        total=len(runs),
+        queued=queued,
+        running=counts[RunStatus.running] - queued,
+        succeeded=counts[RunStatus.succeeded],
+        failed=counts[RunStatus.failed],
+        canceled=counts[RunStatus.canceled],
+        runs=runs,
+    )
+
+
+def _launch_review(
+    *,
+    session: Session,
+    document_id: str | None,
+    text: str | None,
+    filename: str | None,
+    stream: bool,
+    previous: ReviewRecord | None,
+    store: InMemoryRunStore,
+    file_store: FileStore,
+    parser: DocumentParser,
+    service: ReviewService,
+    scheduler: RunScheduler,
+    modes: list[Mode] | None = None,
+    time_budget_s: float | None = None,
+) -> Run:
+    started_at = time.monotonic()
+    modes = list(dict.fromkeys(modes or [session.mode]))
+    run = store.create(
+        session_id=session.id,
+        mode=modes[0],
+        document_id=document_id,
+        modes=modes,
+    )
+    records = {mode: ReviewRecord() for mode in modes}
+    store.set_review_record(run.id, records[modes[0]])
     store.set_phase(run.id, RunPhase.received)
     store.add_event(RunEvent(run_id=run.id, type=EventType.info, message="received"))
 
     async def emit(event_type: EventType, message: str) -> None:
+        if event_type == EventType.info:
+            phase = _PHASE_BY_MESSAGE.get(message.split(" ", 1)[0])
+            if phase is not None:
+                store.set_phase(run.id, phase)
         store.add_event(RunEvent(run_id=run.id, type=event_type, message=message))
 
+    async def emit_mode(mode: Mode, event_type: EventType, message: str) -> None:
+        await emit(event_type, message if len(modes) == 1 else f"{message} [{mode.value}]")
+
     def should_cancel() -> bool:
         item = store.get(run.id)
         return bool(item and item.run.status == RunStatus.canceled)
 
+    artifacts: dict[Mode, StoreResult] = {}
+
+    def artifact_name(mode: Mode) -> str:
+        if len(modes) == 1:
+            return filename or f"{mode.value}.md"
+        return f"{Path(filename).stem}.{mode.value}.md" if filename else f"{mode.value}.md"
+
+    pending: dict[Mode, list[str]] = {}
+    flushed_at: dict[Mode, float] = {}
+
+    async def flush_output(mode: Mode) -> None:
+        pieces = pending.pop(mode, None)
+        flushed_at[mode] = time.monotonic()
+        if not pieces:
+            return
+        text = "".join(pieces)
+        artifact = artifacts.get(mode)
+        if artifact is None:
+            artifact = await asyncio.to_thread(
+                file_store.create_review,
+                artifact_name(mode),
+                session_id=session.id,
+                run_id=run.id,
+                source_document_id=document_id,
+            )
+            artifacts[mode] = artifact
+            store.set_artifact(run.id, artifact.manifest.id, mode=mode)
+        await asyncio.to_thread(file_store.append_review, artifact.manifest, text)
+        store.add_event(
+            RunEvent(
+                run_id=run.id,
+                type=EventType.output,
+                message=text,
+                mode=mode if len(modes) > 1 else None,
+            )
+        )
+
+    async def on_token(mode: Mode, piece: str) -> None:
+        buf = pending.setdefault(mode, [])
+        buf.append(piece)
+        if (
+            sum(len(p) for p in buf) >= _OUTPUT_FLUSH_CHARS
+            or time.monotonic() - flushed_at.get(mode, 0.0) >= _OUTPUT_FLUSH_SECONDS
+        ):
+            await flush_output(mode)
+
     async def worker() -> None:
         try:
-            text = (body.text or "").strip()
-            if not text:
-                if not body.document_id:
+            if should_cancel():
+                return
+            document = (text or "").strip()
+            segments: AsyncIterator[str] | None = None
+            if not document:
+                if not document_id:
                     raise ValueError("document_id or text is required")
-                manifest = file_store.get_manifest("document", body.document_id)
+                manifest = file_store.get_manifest("document", document_id)
                 if not manifest:
                     raise ValueError("document not found")
                 store.set_phase(run.id, RunPhase.parsing)
                 await emit(EventType.info, "parsing")
-                from pathlib import Path
-
-                text = await parser.parse(Path(manifest.path))
-            store.set_phase(run.id, RunPhase.planning)
-            result = await service.review(
-                mode=session.mode,
-                language=session.language,
-                document=text,
-                emit=emit,
-                should_cancel=should_cancel,
-            )
+                path = Path(manifest.path)
+                if stream and len(modes) == 1 and time_budget_s is None:
+                    segments = parser.stream(path)
+                else:
+                    with usage_stage("parsing"):
+                        document = await parser.parse(path)
+            mode = modes[0]
+            if len(modes) > 1:
+                store.set_phase(run.id, RunPhase.planning)
+                results = await service.review_many(
+                    modes=modes,
+                    language=session.language,
+                    document=document,
+                    emit=emit_mode,
+                    should_cancel=should_cancel,
+                    records=records,
+                    on_token=on_token,
+                    time_budget_s=time_budget_s,
+                    started_at=started_at,
+                )
+            elif segments is not None:
+                results = {
+                    mode: await service.review_stream(
+                        mode=mode,
+                        language=session.language,
+                        segments=segments,
+                        emit=emit,
+                        should_cancel=should_cancel,
+                        record=records[mode],
+                        previous=previous,
+                        on_token=partial(on_token, mode),
+                    )
+                }
+            else:
+                store.set_phase(run.id, RunPhase.planning)
+                results = {
+                    mode: await service.review(
+                        mode=mode,
+                        language=session.language,
+                        document=document,
+                        emit=emit,
+                        should_cancel=should_cancel,
+                        record=records[mode],
+                        previous=previous,
+                        on_token=partial(on_token, mode),
+                        time_budget_s=time_budget_s,
+                        started_at=started_at,
+                    )
+                }
+            for mode in list(pending):
+                await flush_output(mode)
             if should_cancel():
                 store.set_status(run.id, RunStatus.canceled)
                 await emit(EventType.info, "canceled")
                 return
             store.set_phase(run.id, RunPhase.producing)
-            filename = body.filename or f"{session.mode.value}.md"
-            artifact = file_store.save_review(
-                result,
-                filename,
-                session_id=session.id,
-                run_id=run.id,
-                source_document_id=body.document_id,
-            )
-            store.set_artifact(run.id, artifact.manifest.id)
+            if any(r.partial for r in records.values()):
+                store.set_partial(run.id)
+            for mode, result in results.items():
+                artifact = artifacts.get(mode)
+                if artifact is None:
+                    artifact = file_store.save_review(
+                        result,
+                        artifact_name(mode),
+                        session_id=session.id,
+                        run_id=run.id,
+                        source_document_id=document_id,
+                    )
+                    store.set_artifact(run.id, artifact.manifest.id, mode=mode)
+                else:
+                    await asyncio.to_thread(file_store.write_review, artifact.manifest, result)
             store.set_status(run.id, RunStatus.succeeded)
             await emit(EventType.info, "succeeded")
         except Exception as e:
@@ -137,9 +439,20 @@ async def start_review(
                 return
             store.set_status(run.id, RunStatus.failed, error=str(e))
             await emit(EventType.error, str(e))
+        except asyncio.CancelledError:
+            if not should_cancel():
+                store.set_status(run.id, RunStatus.canceled)
+                await emit(EventType.info, "canceled")
+            raise
 
-    asyncio.create_task(worker())
-    return StartReviewResponse(run_id=run.id)
+    usage = store.usage(run.id)
+
+    async def tracked_worker() -> None:
+        with track_usage(usage):
+            await worker()
+
+    store.set_task(run.id, scheduler.submit(tracked_worker()))
+    return run
 
 
 @router.post("/runs/{run_id}/cancel", response_model=CancelRunResponse)
@@ -159,7 +472,7 @@ async def cancel_run(
     item = store.get(run_id)
     if not item:
         raise HTTPException(status_code=404, detail="run not found")
-    store.set_status(run_id, RunStatus.canceled)
+    store.cancel(run_id)
     store.add_event(RunEvent(run_id=run_id, type=EventType.info, message="canceled"))
     updated = store.get(run_id)
     if not updated:
@@ -167,6 +480,26 @@ async def cancel_run(
     return CancelRunResponse(run_id=updated.run.id, status=updated.run.status)
 
 
+@router.get("/runs/{run_id}/metrics", response_model=RunMetrics)
+async def get_metrics(
+    run_id: str,
+    store: InMemoryRunStore = Depends(get_run_store),
+) -> RunMetrics:
+    """Get token, latency and call accounting of a run.
+
+    Args:
+        run_id: Run identifier.
+
+    Returns:
+        Per-stage and per-call model usage.
+    """
+
+    metrics = store.get_metrics(run_id)
+    if metrics is None:
+        raise HTTPException(status_code=404, detail="run not found")
+    return metrics
+
+
 @router.get("/runs/{run_id}/events", response_model=list[RunEvent])
 async def get_events(
     run_id: str,
@@ -1,26 +1,44 @@
 from __future__ import annotations
 
+import asyncio
 import uuid
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
+from src.agent.review_handler import ReviewRecord
 from src.models.enums import Mode
 from src.models.events import RunEvent
-from src.models.run import Run, RunPhase, RunStatus
+from src.models.run import CallMetrics, Run, RunMetrics, RunPhase, RunStatus, StageMetrics
+from src.models.usage import UsageTracker
 
 
 @dataclass
 class RunWithEvents:
     run: Run
     events: list[RunEvent]
+    review_record: ReviewRecord | None = None
+    usage: UsageTracker = field(default_factory=UsageTracker)
+    task: asyncio.Task[None] | None = None
 
 
 class InMemoryRunStore:
     def __init__(self) -> None:
         self._runs: dict[str, RunWithEvents] = {}
 
-    def create(self, session_id: str, mode: Mode, document_id: str | None = None) -> Run:
+    def create(
+        self,
+        session_id: str,
+        mode: Mode,
+        document_id: str | None = None,
+        modes: list[Mode] | None = None,
+    ) -> Run:
         run_id = uuid.uuid4().hex
-        run = Run(id=run_id, session_id=session_id, mode=mode, document_id=document_id)
+        run = Run(
+            id=run_id,
+            session_id=session_id,
+            mode=mode,
+            document_id=document_id,
+            modes=modes or [mode],
+        )
         self._runs[run_id] = RunWithEvents(run=run, events=[])
         return run
 
@@ -36,10 +54,81 @@ class InMemoryRunStore:
         item.run.status = status
         item.run.error = error
 
-    def set_artifact(self, run_id: str, artifact_id: str) -> None:
+    def set_artifact(self, run_id: str, artifact_id: str, mode: Mode | None = None) -> None:
         item = self._runs[run_id]
-        item.run.artifact_id = artifact_id
+        if mode is None or mode == item.run.mode:
+            item.run.artifact_id = artifact_id
+        item.run.artifact_ids[mode or item.run.mode] = artifact_id
+
+    def set_partial(self, run_id: str) -> None:
+        item = self._runs[run_id]
+        item.run.partial = True
+
+    def set_task(self, run_id: str, task: asyncio.Task[None]) -> None:
+        item = self._runs[run_id]
+        item.task = task
+
+    def cancel(self, run_id: str) -> None:
+        item = self._runs[run_id]
+        item.run.status = RunStatus.canceled
+        task = item.task
+        if task is not None and not task.done():
+            task.get_loop().call_soon_threadsafe(task.cancel)
+
+    def set_review_record(self, run_id: str, record: ReviewRecord) -> None:
+        item = self._runs[run_id]
+        item.review_record = record
+
+    def usage(self, run_id: str) -> UsageTracker:
+        return self._runs[run_id].usage
 
     def add_event(self, event: RunEvent) -> None:
         item = self._runs[event.run_id]
         item.events.append(event)
+
+    def get_metrics(self, run_id: str) -> RunMetrics | None:
+        item = self._runs.get(run_id)
+        if item is None:
+            return None
+        usage = item.usage
+        calls = [
+            CallMetrics(
+                stage=c.stage,
+                seconds=c.seconds,
+                input_tokens=c.usage.input_tokens,
+                output_tokens=c.usage.output_tokens,
+                cached_tokens=c.usage.cached_tokens,
+            )
+            for c in usage.call_log
+        ]
+        stages: dict[str, StageMetrics] = {}
+        for name in [*usage.stage_seconds, *[c.stage for c in calls]]:
+            if name not in stages:
+                stages[name] = StageMetrics(
+                    stage=name,
+                    seconds=usage.stage_seconds.get(name, 0.0),
+                    calls=0,
+                    input_tokens=0,
+                    output_tokens=0,
+                    cached_tokens=0,
+                )
+        for c in calls:
+            stage = stages[c.stage]
+            stage.calls += 1
+            stage.input_tokens += c.input_tokens
+            stage.output_tokens += c.output_tokens
+            stage.cached_tokens += c.cached_tokens
+        return RunMetrics(
+            run_id=run_id,
+            calls=usage.calls,
+            input_tokens=usage.input_tokens,
+            output_tokens=usage.output_tokens,
+            cached_tokens=usage.cached_tokens,
+            hedges=usage.hedges,
+            hedge_wins=usage.hedge_wins,
+            tool_calls=usage.tool_calls,
+            tool_cache_hits=usage.tool_cache_hits,
+            tool_tokens_elided=usage.tool_tokens_elided,
+            stages=list(stages.values()),
+            call_log=calls,
+        )
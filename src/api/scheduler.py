@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Coroutine
+from typing import Any
+
+
+class RunScheduler:
+    def __init__(self, max_concurrent_runs: int) -> None:
+        self._semaphore = asyncio.Semaphore(max(1, max_concurrent_runs))
+        self._tasks: set[asyncio.Task[None]] = set()
+        self.active = 0
+
+    @property
+    def queued(self) -> int:
+        return len(self._tasks) - self.active
+
+    def submit(self, job: Coroutine[Any, Any, None]) -> asyncio.Task[None]:
+        task = asyncio.create_task(self._run(job))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def _run(self, job: Coroutine[Any, Any, None]) -> None:
+        try:
+            async with self._semaphore:
+                self.active += 1
+                try:
+                    await job
+                finally:
+                    self.active -= 1
+        finally:
+            job.close()
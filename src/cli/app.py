@@ -1,11 +1,13 @@
 from __future__ import annotations
 
 import asyncio
+import time
 from typing import Literal
 
 import solara
 
 from src.api import deps
+from src.config.loader import get_config_section
 from src.models.entities import Message
 from src.models.enums import Mode
 
@@ -273,6 +275,7 @@ def _render_review_mode(
             nonlocal session_id
             if review_trigger == 0:
                 return
+            started_at = time.monotonic()
             run_store = deps.get_run_store()
             from src.models.events import EventType, RunEvent
             from src.models.run import RunStatus
@@ -304,6 +307,9 @@ def _render_review_mode(
                     session_id=session_id, mode=Mode(mode), document_id=doc_id
                 )
                 run_id_local = run.id
+                current = asyncio.current_task()
+                if current is not None:
+                    run_store.set_task(run.id, current)
                 set_run_id(run.id)
                 set_run_events([])
                 set_reviewing(True)
@@ -323,12 +329,16 @@ def _render_review_mode(
                     parsed = await deps.get_document_parser().parse(path)
                     text = parsed
                 service = deps.get_review_service()
+                review_settings = get_config_section(["review"]) or {}
+                time_budget_s = review_settings.get("ui_time_budget_s")
                 result = await service.review(
                     mode=Mode(mode),
                     language=language,
                     document=text,
                     emit=emit,
                     should_cancel=should_cancel,
+                    time_budget_s=float(time_budget_s) if time_budget_s else None,
+                    started_at=started_at,
                 )
                 file_store = deps.get_file_store()
                 artifact = file_store.save_review(
@@ -404,9 +414,8 @@ def _render_review_mode(
                 return
             run_store = deps.get_run_store()
             from src.models.events import EventType, RunEvent
-            from src.models.run import RunStatus
 
-            run_store.set_status(run_id, status=RunStatus.canceled)
+            run_store.cancel(run_id)
             run_store.add_event(
                 RunEvent(run_id=run_id, type=EventType.info, message="canceled")
             )
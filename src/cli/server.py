@@ -9,6 +9,7 @@ from src.api.routes_artifacts import router as artifacts_router
 from src.api.routes_documents import router as documents_router
 from src.api.routes_runs import router as runs_router
 from src.api.routes_sessions import router as sessions_router
+from src.prompt.registry import get_prompt_registry
 
 
 class _SolaraContextResetApp:
@@ -30,6 +31,7 @@ def create_app() -> FastAPI:
         redoc_url="/api/redoc",
         openapi_url="/api/openapi.json",
     )
+    get_prompt_registry()
     install_error_handlers(app)
     app.include_router(sessions_router)
     app.include_router(documents_router)
@@ -1,6 +1,9 @@
 from __future__ import annotations
 
 import os
+import threading
+import time
+from collections.abc import Callable
 from pathlib import Path
 from typing import Any
 
@@ -42,16 +45,88 @@ def _resolve_env(value: Any) -> Any:
     return value
 
 
-def load_raw_config() -> dict[str, Any]:
-    global_cfg = _read_yaml(get_global_config_path())
-    project_cfg = _read_yaml(get_project_config_path())
-    merged = _merge_dicts(global_cfg, project_cfg)
+def _load_from_disk(paths: tuple[Path, ...]) -> dict[str, Any]:
+    merged: dict[str, Any] = {}
+    for path in paths:
+        merged = _merge_dicts(merged, _read_yaml(path))
     resolved = _resolve_env(merged)
     if not isinstance(resolved, dict):
         raise ValueError("Config root must be a mapping")
     return resolved
 
 
+def _signature(paths: tuple[Path, ...]) -> tuple[tuple[str, int, int], ...]:
+    out: list[tuple[str, int, int]] = []
+    for path in paths:
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            out.append((str(path), -1, -1))
+            continue
+        out.append((str(path), stat.st_mtime_ns, stat.st_size))
+    return tuple(out)
+
+
+class ConfigService:
+    def __init__(self, revalidate_interval_s: float = 1.0) -> None:
+        self._revalidate_interval_s = revalidate_interval_s
+        self._lock = threading.Lock()
+        self._config: dict[str, Any] | None = None
+        self._paths: tuple[Path, ...] = ()
+        self._signature: tuple[tuple[str, int, int], ...] = ()
+        self._checked_at = 0.0
+        self._subscribers: list[Callable[[dict[str, Any]], None]] = []
+
+    def subscribe(self, callback: Callable[[dict[str, Any]], None]) -> Callable[[], None]:
+        self._subscribers.append(callback)
+
+        def _unsubscribe() -> None:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+        return _unsubscribe
+
+    def get(self, force: bool = False) -> dict[str, Any]:
+        paths = (get_global_config_path(), get_project_config_path())
+        now = time.monotonic()
+        with self._lock:
+            config = self._config
+            fresh = now - self._checked_at < self._revalidate_interval_s
+            if config is not None and not force and paths == self._paths and fresh:
+                return config
+            signature = _signature(paths)
+            self._checked_at = now
+            if config is not None and not force and (paths, signature) == (
+                self._paths,
+                self._signature,
+            ):
+                return config
+            previous = config
+            config = _load_from_disk(paths)
+            self._config = config
+            self._paths = paths
+            self._signature = signature
+        if previous is not None and previous != config:
+            for callback in list(self._subscribers):
+                callback(config)
+        return config
+
+
+_config_service = ConfigService()
+
+
+def get_config_service() -> ConfigService:
+    return _config_service
+
+
+def load_raw_config() -> dict[str, Any]:
+    return _config_service.get()
+
+
+def reload_config() -> dict[str, Any]:
+    return _config_service.get(force=True)
+
+
 def get_config_section(keys: list[str]) -> dict[str, Any] | None:
     data: Any = load_raw_config()
     for key in keys:
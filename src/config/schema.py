@@ -16,6 +16,8 @@ class ChatModelSettings(BaseModel):
 
 class ModelsConfig(BaseModel):
     chat_model: ChatModelSettings
+    named: dict[str, ChatModelSettings] = Field(default_factory=dict)
+    routing: dict[str, dict[str, str]] = Field(default_factory=dict)
 
 
 class AppConfig(BaseModel):
@@ -3,71 +3,100 @@ from __future__ import annotations
 import asyncio
 import json
 import os
+import random
+import threading
+import time
+from collections.abc import AsyncIterator, Callable
+from importlib.util import find_spec
+from pathlib import Path
 from typing import Any
 
-from langchain_core.messages import ToolMessage
+import httpx
+import openai
+from langchain_core.messages import BaseMessageChunk, ToolMessage, message_chunk_to_message
 from langchain_openai import ChatOpenAI
 from pydantic import SecretStr
 
-from src.config.loader import get_config_section
+from src.config.loader import get_config_section, get_config_service
+from src.models.concurrency import ConcurrencyLimitedChatModel, LoopLocalSemaphore
+from src.models.hedging import HedgedChatModel, HedgePolicy, mark_attempt, model_attempt
+from src.models.http_client import LoopLocalTransport
 from src.models.provider import ChatModel
-
-_MCP_TOOLS: list[Any] | None = None
-_MCP_TOOLS_LOCK: asyncio.Lock | None = None
-
-
-def _get_mcp_tools_lock() -> asyncio.Lock:
-    global _MCP_TOOLS_LOCK
-    if _MCP_TOOLS_LOCK is None:
-        _MCP_TOOLS_LOCK = asyncio.Lock()
-    return _MCP_TOOLS_LOCK
+from src.models.registry import ModelRegistry
+from src.models.response_cache import CachingChatModel, ResponseCache, settings_namespace
+from src.models.router import DEFAULT_MODEL, ModelRouter, build_model_router
+from src.models.tool_cache import ToolResultCache, tool_cache_key
+from src.models.tool_compaction import ToolCompaction
+from src.models.usage import current_tracker, record_usage, usage_from_message
+from src.tools.mcp.pool import MCPClientPool, build_mcp_pool
+from src.utils.storage_paths import get_datas_dir
+from src.utils.tokens import estimate_tokens
+
+_MCP_POOLS: dict[asyncio.AbstractEventLoop, tuple[str, MCPClientPool | None]] = {}
+_MCP_POOLS_LOCK = threading.Lock()
+_TOOL_RESULT_CACHE: ToolResultCache | None = None
+_RESPONSE_CACHES: dict[str, ResponseCache] = {}
+_LLM_SEMAPHORES: dict[int, LoopLocalSemaphore] = {}
+_HEDGE_POLICIES: dict[str, tuple[str, HedgePolicy]] = {}
+_RATE_LIMITERS: dict[str, tuple[tuple[Any, Any], RateLimiter]] = {}
+_HTTP_CLIENT: tuple[str, httpx.AsyncClient, LoopLocalTransport] | None = None
+_MODEL_REGISTRY = ModelRegistry()
+
+
+def _on_config_change(config: dict[str, Any]) -> None:
+    _MODEL_REGISTRY.clear()
+    if _TOOL_RESULT_CACHE is not None:
+        _TOOL_RESULT_CACHE.clear()
+
+
+get_config_service().subscribe(_on_config_change)
+
+
+async def get_mcp_pool() -> MCPClientPool | None:
+    tools_cfg = get_config_section(["tools"]) or {}
+    key = json.dumps(
+        {"servers": tools_cfg.get("mcp_servers"), "pool": tools_cfg.get("pool")},
+        sort_keys=True,
+        default=str,
+    )
+    loop = asyncio.get_running_loop()
+    with _MCP_POOLS_LOCK:
+        for closed in [item for item in _MCP_POOLS if item.is_closed()]:
+            del _MCP_POOLS[closed]
+        entry = _MCP_POOLS.get(loop)
+        if entry is not None and entry[0] == key:
+            return entry[1]
+        pool = build_mcp_pool(tools_cfg)
+        _MCP_POOLS[loop] = (key, pool)
+    if entry is not None and entry[1] is not None:
+        await entry[1].stop()
+    return pool
 
 
 async def load_mcp_tools() -> list[Any]:
-    global _MCP_TOOLS
-    if _MCP_TOOLS is not None:
-        return _MCP_TOOLS
-
-    async with _get_mcp_tools_lock():
-        if _MCP_TOOLS is not None:
-            return _MCP_TOOLS
-
-        servers_cfg = get_config_section(["tools", "mcp_servers"])
-        if not servers_cfg:
-            _MCP_TOOLS = []
-            return _MCP_TOOLS
-
-        try:
-            from langchain_mcp_adapters.client import MultiServerMCPClient  # type: ignore
-        except Exception:
-            _MCP_TOOLS = []
-            return _MCP_TOOLS
-
-        servers: dict[str, dict[str, Any]] = {}
-        for name, cfg in servers_cfg.items():
-            if not isinstance(cfg, dict):
-                continue
-            transport = cfg.get("transport")
-            url = cfg.get("url")
-            if isinstance(transport, str) and isinstance(url, str):
-                servers[name] = {"transport": transport, "url": url}
-
-        if not servers:
-            _MCP_TOOLS = []
-            return _MCP_TOOLS
-
-        client = MultiServerMCPClient(servers)
-        tools: Any
-        try:
-            tools = await client.get_tools()
-        except Exception:
-            tools = []
-
-        if isinstance(tools, list):
-            _MCP_TOOLS = tools
-        else:
-            _MCP_TOOLS = []
-        return _MCP_TOOLS
+    pool = await get_mcp_pool()
+    if pool is None:
+        return []
+    await pool.start()
+    return pool.tools()
+
+
+def mcp_tool_cache_ttl(tool_name: str) -> float:
+    try:
+        entry = _MCP_POOLS.get(asyncio.get_running_loop())
+    except RuntimeError:
+        entry = None
+    pool = entry[1] if entry is not None else None
+    server_name = pool.server_for(tool_name) if pool is not None else None
+    if server_name is None:
+        return 0.0
+    cfg = get_config_section(["tools", "mcp_servers", server_name, "cache"]) or {}
+    per_tool = cfg.get("tools")
+    if isinstance(per_tool, dict) and tool_name in per_tool:
+        ttl = per_tool[tool_name]
+    else:
+        ttl = cfg.get("ttl_seconds")
+    return float(ttl) if isinstance(ttl, int | float) else 0.0
 
 
 def _extract_tool_calls(msg: Any) -> list[dict[str, Any]]:
@@ -103,24 +132,73 @@ def _normalize_tool_args(raw: Any) -> dict[str, Any]:
     return {"input": raw}
 
 
+async def _invoke_tool(tool: Any, name: str, args: Any) -> Any:
+    try:
+        ainvoke = tool.ainvoke
+    except AttributeError:
+        ainvoke = None
+    if callable(ainvoke):
+        return await ainvoke(args)
+    try:
+        invoke = tool.invoke
+    except AttributeError:
+        invoke = None
+    if callable(invoke):
+        return await asyncio.to_thread(invoke, args)
+    return f"tool not invokable: {name}"
+
+
+def _compact_tool_results(
+    compaction: ToolCompaction, messages: list[Any], stale_from: int, contents: list[str]
+) -> list[str]:
+    elided = 0
+    for idx in range(stale_from, len(messages)):
+        message = messages[idx]
+        if isinstance(message, ToolMessage) and isinstance(message.content, str):
+            stale = compaction.stale(message.content)
+            if stale.elided_tokens:
+                elided += stale.elided_tokens
+                messages[idx] = message.model_copy(update={"content": stale.content})
+    budget = compaction.result_budget(len(contents))
+    out: list[str] = []
+    for content in contents:
+        result = compaction.compact(content, budget)
+        elided += result.elided_tokens
+        out.append(result.content)
+    tracker = current_tracker()
+    if tracker is not None:
+        tracker.tool_tokens_elided += elided
+    return out
+
+
 class ToolCallingChatModel:
     def __init__(
         self,
         base_model: ChatModel,
         *,
         max_tool_iterations: int = 8,
+        max_parallel_tool_calls: int = 4,
+        tool_timeout_s: float | None = 60.0,
+        tool_cache: ToolResultCache | None = None,
+        tool_cache_ttl: Callable[[str], float] = mcp_tool_cache_ttl,
+        compaction: ToolCompaction | None = None,
     ) -> None:
         self._base_model = base_model
         self._max_tool_iterations = max_tool_iterations
+        self._max_parallel_tool_calls = max(1, max_parallel_tool_calls)
+        self._tool_timeout_s = tool_timeout_s
+        self._tool_cache = tool_cache
+        self._tool_cache_ttl = tool_cache_ttl
+        self._compaction = compaction
         self._tools_loaded = False
         self._tools: list[Any] = []
         self._bound_model: Any = base_model
 
     async def _ensure_tools_loaded(self) -> None:
-        if self._tools_loaded:
+        tools = await load_mcp_tools()
+        if self._tools_loaded and tools is self._tools:
             return
 
-        tools = await load_mcp_tools()
         self._tools = tools
         self._tools_loaded = True
 
@@ -145,76 +223,329 @@ class ToolCallingChatModel:
     ) -> Any:
         await self._ensure_tools_loaded()
         if not self._tools:
-            return await self._base_model.ainvoke(input, config=config, **kwargs)
+            return await self._call(self._base_model, input, config, kwargs)
 
         if not isinstance(input, list):
-            return await self._bound_model.ainvoke(input, config=config, **kwargs)
+            return await self._call(self._bound_model, input, config, kwargs)
+        return await self._tool_loop(list(input), config, kwargs)
 
+    async def _tool_loop(
+        self,
+        messages: list[Any],
+        config: Any | None,
+        kwargs: dict[str, Any],
+        first: Any | None = None,
+    ) -> Any:
         tool_by_name: dict[str, Any] = {}
         for tool in self._tools:
             name = getattr(tool, "name", None)
             if isinstance(name, str) and name:
                 tool_by_name[name] = tool
 
-        messages: list[Any] = list(input)
+        stale_from = len(messages)
         last: Any | None = None
         for _ in range(self._max_tool_iterations):
-            last = await self._bound_model.ainvoke(messages, config=config, **kwargs)
+            if first is not None:
+                last, first = first, None
+            else:
+                last = await self._call(self._bound_model, messages, config, kwargs)
             tool_calls = _extract_tool_calls(last)
             if not tool_calls:
                 return last
 
             messages.append(last)
-            for call in tool_calls:
-                name = call.get("name")
-                if not isinstance(name, str) or not name:
-                    continue
-                tool = tool_by_name.get(name)
-                call_id = call.get("id") or call.get("tool_call_id") or name
-                args = _normalize_tool_args(call.get("args") or call.get("arguments"))
-
-                if tool is None:
-                    messages.append(
-                        ToolMessage(
-                            content=f"tool not found: {name}",
-                            tool_call_id=str(call_id),
-                        )
-                    )
-                    continue
-
-                try:
-                    try:
-                        ainvoke = tool.ainvoke
-                    except AttributeError:
-                        ainvoke = None
-                    if callable(ainvoke):
-                        result = await ainvoke(args)
-                    else:
-                        try:
-                            invoke = tool.invoke
-                        except AttributeError:
-                            invoke = None
-                        if callable(invoke):
-                            result = invoke(args)
-                        else:
-                            result = f"tool not invokable: {name}"
-                except Exception as e:
-                    result = f"tool error: {name}: {e}"
-
-                if isinstance(result, str):
-                    content = result
-                else:
-                    try:
-                        content = json.dumps(result, ensure_ascii=False)
-                    except Exception:
-                        content = str(result)
-
+            semaphore = asyncio.Semaphore(self._max_parallel_tool_calls)
+            calls = [c for c in tool_calls if isinstance(c.get("name"), str) and c.get("name")]
+            contents = await asyncio.gather(
+                *(self._run_tool(tool_by_name, call, semaphore) for call in calls)
+            )
+            if self._compaction is not None:
+                contents = _compact_tool_results(self._compaction, messages, stale_from, contents)
+                stale_from = len(messages)
+            for call, content in zip(calls, contents, strict=True):
+                call_id = call.get("id") or call.get("tool_call_id") or call["name"]
                 messages.append(ToolMessage(content=content, tool_call_id=str(call_id)))
 
         if last is None:
-            return await self._bound_model.ainvoke(messages, config=config, **kwargs)
+            return await self._call(self._bound_model, messages, config, kwargs)
         return last
 
+    async def _run_tool(
+        self,
+        tool_by_name: dict[str, Any],
+        call: dict[str, Any],
+        semaphore: asyncio.Semaphore,
+    ) -> str:
+        name = call["name"]
+        tool = tool_by_name.get(name)
+        if tool is None:
+            return f"tool not found: {name}"
+        args = _normalize_tool_args(call.get("args") or call.get("arguments"))
+        tracker = current_tracker()
+        if tracker is not None:
+            tracker.tool_calls += 1
+        cache = self._tool_cache
+        ttl = self._tool_cache_ttl(name) if cache is not None else 0.0
+        key = tool_cache_key(name, args)
+        if cache is not None and ttl > 0:
+            cached = cache.get(key)
+            if cached is not None:
+                if tracker is not None:
+                    tracker.tool_cache_hits += 1
+                return cached
+        try:
+            async with semaphore:
+                result = await asyncio.wait_for(
+                    _invoke_tool(tool, name, args), timeout=self._tool_timeout_s
+                )
+        except TimeoutError:
+            return f"tool timeout: {name}: no result after {self._tool_timeout_s}s"
+        except Exception as e:
+            return f"tool error: {name}: {e}"
+
+        if isinstance(result, str):
+            content = result
+        else:
+            try:
+                content = json.dumps(result, ensure_ascii=False)
+            except Exception:
+                content = str(result)
+        if cache is not None and ttl > 0:
+            cache.put(key, content, ttl)
+        return content
+
+    async def _call(
+        self,
+        model: ChatModel,
+        input: Any,
+        config: Any | None,
+        kwargs: dict[str, Any],
+    ) -> Any:
+        started = time.perf_counter()
+        result = await model.ainvoke(input, config=config, **kwargs)
+        record_usage(result, time.perf_counter() - started)
+        return result
+
+    async def astream(
+        self,
+        input: Any,
+        config: Any | None = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[Any]:
+        await self._ensure_tools_loaded()
+        model = self._bound_model if self._tools else self._base_model
+        astream = getattr(model, "astream", None)
+        if not callable(astream):
+            yield await self.ainvoke(input, config=config, **kwargs)
+            return
+        started = time.perf_counter()
+        merged: BaseMessageChunk | None = None
+        calling_tools = False
+        async for chunk in astream(input, config=config, **kwargs):
+            if isinstance(chunk, BaseMessageChunk):
+                merged = chunk if merged is None else merged + chunk
+                calling_tools = calling_tools or bool(getattr(chunk, "tool_call_chunks", None))
+            if not calling_tools:
+                yield chunk
+        if merged is None:
+            return
+        record_usage(merged, time.perf_counter() - started)
+        if not calling_tools:
+            return
+        first = message_chunk_to_message(merged)
+        if isinstance(input, list):
+            yield await self._tool_loop(list(input), config, kwargs, first=first)
+        else:
+            yield first
+
+
+class RateLimiter:
+    def __init__(
+        self,
+        requests_per_minute: float | None = None,
+        tokens_per_minute: float | None = None,
+    ) -> None:
+        self._rpm = requests_per_minute
+        self._tpm = tokens_per_minute
+        self._requests = float(requests_per_minute or 0)
+        self._tokens = float(tokens_per_minute or 0)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = LoopLocalSemaphore(1)
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._updated
+        self._updated = now
+        if self._rpm:
+            self._requests = min(self._rpm, self._requests + elapsed * self._rpm / 60)
+        if self._tpm:
+            self._tokens = min(self._tpm, self._tokens + elapsed * self._tpm / 60)
+
+    def _wait_time(self, tokens: int, now: float) -> float:
+        wait = self._paused_until - now
+        if self._rpm and self._requests < 1:
+            wait = max(wait, (1 - self._requests) * 60 / self._rpm)
+        if self._tpm:
+            need = min(tokens, self._tpm)
+            if self._tokens < need:
+                wait = max(wait, (need - self._tokens) * 60 / self._tpm)
+        return wait
+
+    async def acquire(self, tokens: int) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                wait = self._wait_time(tokens, now)
+                if wait <= 0:
+                    break
+                await asyncio.sleep(wait)
+            if self._rpm:
+                self._requests -= 1
+            if self._tpm:
+                self._tokens -= tokens
+
+    def consume(self, tokens: int) -> None:
+        if self._tpm:
+            self._tokens -= tokens
+
+    def pause(self, seconds: float) -> None:
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+def _status_code(error: BaseException) -> int | None:
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def _is_retryable(error: BaseException) -> bool:
+    if isinstance(error, openai.APIConnectionError):
+        return True
+    status = _status_code(error)
+    return status is not None and (status in {408, 409, 429} or status >= 500)
+
+
+def _retry_after(error: BaseException) -> float | None:
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    if headers is None:
+        return None
+    raw = headers.get("retry-after-ms")
+    scale = 0.001
+    if raw is None:
+        raw = headers.get("retry-after")
+        scale = 1.0
+    try:
+        return max(0.0, float(raw) * scale) if raw is not None else None
+    except ValueError:
+        return None
+
+
+def _estimate_input_tokens(input: Any) -> int:
+    messages = input if isinstance(input, list) else [input]
+    return sum(estimate_tokens(str(getattr(m, "content", m))) for m in messages)
+
+
+class RateLimitedChatModel:
+    def __init__(
+        self,
+        base_model: ChatModel,
+        limiter: RateLimiter,
+        *,
+        max_retries: int = 5,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+        max_output_tokens: int = 0,
+    ) -> None:
+        self._base_model = base_model
+        self._limiter = limiter
+        self._max_retries = max_retries
+        self._base_delay = base_delay
+        self._max_delay = max_delay
+        self._max_output_tokens = max_output_tokens
+
+    def bind_tools(self, tools: list[Any], **kwargs: Any) -> RateLimitedChatModel:
+        bind_tools = getattr(self._base_model, "bind_tools", None)
+        if not callable(bind_tools):
+            raise AttributeError("base model does not support bind_tools")
+        return RateLimitedChatModel(
+            bind_tools(tools, **kwargs),
+            self._limiter,
+            max_retries=self._max_retries,
+            base_delay=self._base_delay,
+            max_delay=self._max_delay,
+            max_output_tokens=self._max_output_tokens,
+        )
+
+    async def _backoff(self, error: BaseException, attempt: int) -> None:
+        if attempt >= self._max_retries or not _is_retryable(error):
+            raise error
+        delay = _retry_after(error)
+        if delay is None:
+            delay = random.uniform(0, min(self._max_delay, self._base_delay * 2**attempt))
+        if _status_code(error) == 429:
+            self._limiter.pause(delay)
+        await asyncio.sleep(delay)
+
+    def _settle(self, result: Any, reserved: int) -> None:
+        usage = usage_from_message(result)
+        if usage is not None and usage.input_tokens:
+            self._limiter.consume(usage.input_tokens + usage.output_tokens - reserved)
+
+    async def ainvoke(
+        self,
+        input: Any,
+        config: Any | None = None,
+        **kwargs: Any,
+    ) -> Any:
+        reserved = _estimate_input_tokens(input) + self._max_output_tokens
+        attempt = 0
+        while True:
+            mark_attempt(False)
+            await self._limiter.acquire(reserved)
+            try:
+                with model_attempt():
+                    result = await self._base_model.ainvoke(input, config=config, **kwargs)
+            except Exception as e:
+                await self._backoff(e, attempt)
+                attempt += 1
+                continue
+            self._settle(result, reserved)
+            return result
+
+    async def astream(
+        self,
+        input: Any,
+        config: Any | None = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[Any]:
+        astream = getattr(self._base_model, "astream", None)
+        if not callable(astream):
+            yield await self.ainvoke(input, config=config, **kwargs)
+            return
+        reserved = _estimate_input_tokens(input) + self._max_output_tokens
+        attempt = 0
+        while True:
+            await self._limiter.acquire(reserved)
+            merged: BaseMessageChunk | None = None
+            started = False
+            try:
+                async for chunk in astream(input, config=config, **kwargs):
+                    started = True
+                    if isinstance(chunk, BaseMessageChunk):
+                        merged = chunk if merged is None else merged + chunk
+                    yield chunk
+            except Exception as e:
+                if started:
+                    raise
+                await self._backoff(e, attempt)
+                attempt += 1
+                continue
+            if merged is not None:
+                self._settle(merged, reserved)
+            return
+
 
 def _resolve_api_key(settings: dict[str, Any]) -> SecretStr | None:
     api_key = settings.get("api_key")
@@ -227,13 +558,119 @@ def _resolve_api_key(settings: dict[str, Any]) -> SecretStr | None:
     return SecretStr(api_key)
 
 
-def init_chat_model() -> ChatModel:
-    settings = get_config_section(["models", "chat_model"])
-    if not settings:
-        raise ValueError("The `models/chat_model` section in `config.yaml` is not found")
+def get_response_cache(settings: dict[str, Any]) -> ResponseCache:
+    directory = settings.get("dir") or str(get_datas_dir() / "llm_cache")
+    cache = _RESPONSE_CACHES.get(directory)
+    if cache is None:
+        cache = ResponseCache(
+            directory=Path(directory),
+            ttl_seconds=float(settings.get("ttl_seconds", 86400)),
+            max_bytes=int(settings.get("max_bytes", 100 * 1024 * 1024)),
+        )
+        _RESPONSE_CACHES[directory] = cache
+    return cache
+
+
+def get_tool_result_cache(settings: dict[str, Any]) -> ToolResultCache:
+    global _TOOL_RESULT_CACHE
+    if _TOOL_RESULT_CACHE is None:
+        _TOOL_RESULT_CACHE = ToolResultCache(
+            max_entries=int(settings.get("max_entries", 1024)),
+            max_bytes=int(settings.get("max_bytes", 8 * 1024 * 1024)),
+        )
+    return _TOOL_RESULT_CACHE
+
+
+def get_llm_semaphore(max_in_flight: int) -> LoopLocalSemaphore:
+    limit = max(1, max_in_flight)
+    semaphore = _LLM_SEMAPHORES.get(limit)
+    if semaphore is None:
+        semaphore = LoopLocalSemaphore(limit)
+        _LLM_SEMAPHORES[limit] = semaphore
+    return semaphore
+
+
+def get_rate_limiter(name: str, settings: dict[str, Any]) -> RateLimiter:
+    rpm = settings.get("requests_per_minute")
+    tpm = settings.get("tokens_per_minute")
+    cached = _RATE_LIMITERS.get(name)
+    if cached is not None and cached[0] == (rpm, tpm):
+        return cached[1]
+    limiter = RateLimiter(
+        requests_per_minute=float(rpm) if rpm else None,
+        tokens_per_minute=float(tpm) if tpm else None,
+    )
+    _RATE_LIMITERS[name] = ((rpm, tpm), limiter)
+    return limiter
+
+
+def get_hedge_policy(name: str, settings: dict[str, Any]) -> HedgePolicy:
+    fingerprint = json.dumps(settings, sort_keys=True, default=str)
+    cached = _HEDGE_POLICIES.get(name)
+    if cached is not None and cached[0] == fingerprint:
+        return cached[1]
+    policy = HedgePolicy(
+        percentile=float(settings.get("percentile", 0.95)),
+        min_samples=int(settings.get("min_samples", 20)),
+        window=int(settings.get("window", 200)),
+        max_fraction=float(settings.get("max_fraction", 0.1)),
+    )
+    _HEDGE_POLICIES[name] = (fingerprint, policy)
+    return policy
+
+
+def get_http_client(settings: dict[str, Any]) -> httpx.AsyncClient:
+    global _HTTP_CLIENT
+    key = json.dumps(settings, sort_keys=True, default=str)
+    if _HTTP_CLIENT is not None and _HTTP_CLIENT[0] == key:
+        return _HTTP_CLIENT[1]
+    http2 = bool(settings.get("http2", True)) and find_spec("h2") is not None
+    limits = httpx.Limits(
+        max_connections=int(settings.get("max_connections", 100)),
+        max_keepalive_connections=int(settings.get("max_keepalive_connections", 20)),
+        keepalive_expiry=float(settings.get("keepalive_expiry_s", 60)),
+    )
+    transport = LoopLocalTransport(lambda: httpx.AsyncHTTPTransport(http2=http2, limits=limits))
+    client = httpx.AsyncClient(
+        transport=transport,
+        timeout=httpx.Timeout(float(settings.get("timeout_s", 120))),
+    )
+    if _HTTP_CLIENT is not None:
+        _HTTP_CLIENT[2].close_all()
+    _HTTP_CLIENT = (key, client, transport)
+    return client
+
+
+def _model_settings(models: dict[str, Any], name: str) -> dict[str, Any]:
+    if name == DEFAULT_MODEL:
+        settings = models.get("chat_model")
+    else:
+        settings = (models.get("named") or {}).get(name)
+    if not isinstance(settings, dict) or not settings:
+        raise ValueError(f"The model `{name}` in `config.yaml` is not found")
+    return settings
+
+
+def init_chat_model(name: str = DEFAULT_MODEL) -> ChatModel:
+    models = get_config_section(["models"]) or {}
+    settings = _model_settings(models, name)
+    fingerprint = json.dumps(
+        {
+            "settings": settings,
+            "env_api_key": os.getenv("OPENAI_API_KEY"),
+            **{k: models.get(k) for k in ("concurrency", "rate_limit", "hedging", "cache", "http")},
+        },
+        sort_keys=True,
+        default=str,
+    )
+    return _MODEL_REGISTRY.get(name, fingerprint, lambda: _build_chat_model(name, models))
+
+
+def _build_chat_model(name: str, models: dict[str, Any]) -> ChatModel:
+    settings = _model_settings(models, name)
     model = settings.get("model")
     if not model:
-        raise ValueError("The `model` in `config.yaml` is not found")
+        raise ValueError(f"The `model` of `{name}` in `config.yaml` is not found")
     api_key = _resolve_api_key(settings)
     if api_key is None:
         raise ValueError("OpenAI API key is not configured")
@@ -241,5 +678,63 @@ def init_chat_model() -> ChatModel:
     rest_settings.pop("model", None)
     rest_settings.pop("api_key", None)
     rest_settings.pop("type", None)
-    base = ChatOpenAI(model=model, api_key=api_key, **rest_settings)
-    return ToolCallingChatModel(base)
+    rest_settings.setdefault("stream_usage", True)
+    rest_settings.setdefault("max_retries", 0)
+    base: ChatModel = ChatOpenAI(
+        model=model,
+        api_key=api_key,
+        http_async_client=get_http_client(models.get("http") or {}),
+        **rest_settings,
+    )
+    concurrency_settings = models.get("concurrency")
+    if concurrency_settings and concurrency_settings.get("max_in_flight"):
+        base = ConcurrencyLimitedChatModel(
+            base,
+            get_llm_semaphore(int(concurrency_settings["max_in_flight"])),
+        )
+    rate_settings = models.get("rate_limit") or {}
+    base = RateLimitedChatModel(
+        base,
+        get_rate_limiter(name, rate_settings),
+        max_retries=int(rate_settings.get("max_retries", 5)),
+        base_delay=float(rate_settings.get("base_delay_s", 1.0)),
+        max_delay=float(rate_settings.get("max_delay_s", 60.0)),
+        max_output_tokens=int(settings.get("max_tokens") or 0),
+    )
+    hedging_settings = models.get("hedging")
+    if hedging_settings and hedging_settings.get("enabled"):
+        base = HedgedChatModel(base, get_hedge_policy(name, hedging_settings))
+    cache_settings = models.get("cache")
+    if cache_settings and cache_settings.get("enabled"):
+        base = CachingChatModel(
+            base,
+            get_response_cache(cache_settings),
+            namespace=settings_namespace(model, rest_settings),
+        )
+    tool_settings = get_config_section(["tools"]) or {}
+    timeout = tool_settings.get("call_timeout_s", 60)
+    return ToolCallingChatModel(
+        base,
+        max_parallel_tool_calls=int(tool_settings.get("max_parallel_calls", 4)),
+        tool_timeout_s=float(timeout) if timeout else None,
+        tool_cache=get_tool_result_cache(tool_settings.get("result_cache") or {}),
+        compaction=_tool_compaction(tool_settings.get("compaction")),
+    )
+
+
+def _tool_compaction(settings: dict[str, Any] | None) -> ToolCompaction | None:
+    if not settings or not settings.get("enabled", True):
+        return None
+    defaults = ToolCompaction()
+    return ToolCompaction(
+        max_result_tokens=int(settings.get("max_result_tokens", defaults.max_result_tokens)),
+        turn_budget_tokens=int(settings.get("turn_budget_tokens", defaults.turn_budget_tokens)),
+        stale_result_tokens=int(
+            settings.get("stale_result_tokens", defaults.stale_result_tokens)
+        ),
+    )
+
+
+def init_model_router(default: ChatModel | None = None) -> ModelRouter:
+    routing = get_config_section(["models", "routing"]) or {}
+    return build_model_router(routing, default or init_chat_model(), init_chat_model)
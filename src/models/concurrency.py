@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from collections.abc import AsyncIterator
+from typing import Any
+from weakref import WeakKeyDictionary
+
+from src.models.hedging import mark_attempt, model_attempt
+from src.models.provider import ChatModel
+
+
+class LoopLocalSemaphore:
+    def __init__(self, limit: int) -> None:
+        self.limit = max(1, limit)
+        self._semaphores: WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore] = (
+            WeakKeyDictionary()
+        )
+        self._lock = threading.Lock()
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            semaphore = self._semaphores.get(loop)
+            if semaphore is None:
+                semaphore = asyncio.Semaphore(self.limit)
+                self._semaphores[loop] = semaphore
+            return semaphore
+
+    async def __aenter__(self) -> None:
+        await self._semaphore().acquire()
+
+    async def __aexit__(self, *exc: object) -> None:
+        self._semaphore().release()
+
+
+class ConcurrencyLimitedChatModel:
+    def __init__(
+        self, base_model: ChatModel, semaphore: asyncio.Semaphore | LoopLocalSemaphore
+    ) -> None:
+        self._base_model = base_model
+        self._semaphore = semaphore
+
+    def bind_tools(self, tools: list[Any], **kwargs: Any) -> ConcurrencyLimitedChatModel:
+        bind_tools = getattr(self._base_model, "bind_tools", None)
+        if not callable(bind_tools):
+            raise AttributeError("base model does not support bind_tools")
+        return ConcurrencyLimitedChatModel(bind_tools(tools, **kwargs), self._semaphore)
+
+    async def ainvoke(
+        self,
+        input: Any,
+        config: Any | None = None,
+        **kwargs: Any,
+    ) -> Any:
+        mark_attempt(False)
+        async with self._semaphore:
+            with model_attempt():
+                return await self._base_model.ainvoke(input, config=config, **kwargs)
+
+    async def astream(
+        self,
+        input: Any,
+        config: Any | None = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[Any]:
+        async with self._semaphore:
+            astream = getattr(self._base_model, "astream", None)
+            if not callable(astream):
+                yield await self._base_model.ainvoke(input, config=config, **kwargs)
+                return
+            async for chunk in astream(input, config=config, **kwargs):
+                yield chunk
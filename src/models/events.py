@@ -5,16 +5,20 @@ from enum import StrEnum
 
 from pydantic import BaseModel, Field
 
+from src.models.enums import Mode
+
 
 class EventType(StrEnum):
     info = "info"
     todo = "todo"
     error = "error"
+    output = "output"
 
 
 class RunEvent(BaseModel):
     run_id: str
     type: EventType
     message: str
+    mode: Mode | None = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import math
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any
+
+from src.models.provider import ChatModel
+from src.models.usage import current_stage, current_tracker
+
+
+@dataclass(frozen=True)
+class HedgeStats:
+    requests: int
+    hedged: int
+    hedge_wins: int
+
+
+class _AttemptClock:
+    def __init__(self) -> None:
+        self.started_at: float | None = time.perf_counter()
+        self.seconds: float | None = None
+        self.changed = asyncio.Event()
+
+    def set_running(self, running: bool) -> None:
+        now = time.perf_counter()
+        if running:
+            self.started_at = now
+        elif self.started_at is not None:
+            self.seconds = now - self.started_at
+            self.started_at = None
+        self.changed.set()
+
+
+_ATTEMPT_CLOCK: contextvars.ContextVar[_AttemptClock | None] = contextvars.ContextVar(
+    "attempt_clock", default=None
+)
+
+
+def mark_attempt(running: bool) -> None:
+    clock = _ATTEMPT_CLOCK.get()
+    if clock is not None:
+        clock.set_running(running)
+
+
+@contextmanager
+def model_attempt() -> Iterator[None]:
+    mark_attempt(True)
+    try:
+        yield
+    finally:
+        mark_attempt(False)
+
+
+class HedgePolicy:
+    def __init__(
+        self,
+        percentile: float = 0.95,
+        min_samples: int = 20,
+        window: int = 200,
+        max_fraction: float = 0.1,
+    ) -> None:
+        self._percentile = percentile
+        self._min_samples = min_samples
+        self._window = window
+        self._max_fraction = max_fraction
+        self._latencies: dict[str, deque[float]] = {}
+        self.requests = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    def observe(self, stage: str, seconds: float) -> None:
+        samples = self._latencies.get(stage)
+        if samples is None:
+            samples = deque(maxlen=self._window)
+            self._latencies[stage] = samples
+        samples.append(seconds)
+
+    def threshold(self, stage: str) -> float | None:
+        samples = self._latencies.get(stage)
+        if samples is None or len(samples) < self._min_samples:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, math.ceil(self._percentile * len(ordered)) - 1)]
+
+    def allow_hedge(self) -> bool:
+        return self.hedged + 1 <= self._max_fraction * self.requests
+
+    def stats(self) -> HedgeStats:
+        return HedgeStats(requests=self.requests, hedged=self.hedged, hedge_wins=self.hedge_wins)
+
+
+class HedgedChatModel:
+    def __init__(self, base_model: ChatModel, policy: HedgePolicy) -> None:
+        self._base_model = base_model
+        self._policy = policy
+
+    @property
+    def policy(self) -> HedgePolicy:
+        return self._policy
+
+    def bind_tools(self, tools: list[Any], **kwargs: Any) -> HedgedChatModel:
+        bind_tools = getattr(self._base_model, "bind_tools", None)
+        if not callable(bind_tools):
+            raise AttributeError("base model does not support bind_tools")
+        return HedgedChatModel(bind_tools(tools, **kwargs), self._policy)
+
+    async def ainvoke(
+        self,
+        input: Any,
+        config: Any | None = None,
+        **kwargs: Any,
+    ) -> Any:
+        policy = self._policy
+        stage = current_stage()
+        policy.requests += 1
+        clocks: dict[asyncio.Task[Any], _AttemptClock] = {}
+
+        def _start() -> asyncio.Task[Any]:
+            clock = _AttemptClock()
+            context = contextvars.copy_context()
+            context.run(_ATTEMPT_CLOCK.set, clock)
+            task = asyncio.create_task(
+                self._base_model.ainvoke(input, config=config, **kwargs), context=context
+            )
+            clocks[task] = clock
+            return task
+
+        primary = _start()
+        tasks = [primary]
+        try:
+            threshold = policy.threshold(stage)
+            if threshold is not None:
+                overdue = await _wait_overdue(primary, clocks[primary], threshold)
+                if overdue and policy.allow_hedge():
+                    policy.hedged += 1
+                    tracker = current_tracker()
+                    if tracker is not None:
+                        tracker.hedges += 1
+                    tasks.append(_start())
+            winner = await _first_success(tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        clock = clocks[winner]
+        if clock.started_at is not None:
+            clock.set_running(False)
+        if clock.seconds is not None:
+            policy.observe(stage, clock.seconds)
+        if winner is not primary:
+            policy.hedge_wins += 1
+            tracker = current_tracker()
+            if tracker is not None:
+                tracker.hedge_wins += 1
+        return winner.result()
+
+    async def astream(
+        self,
+        input: Any,
+        config: Any | None = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[Any]:
+        astream = getattr(self._base_model, "astream", None)
+        if not callable(astream):
+            yield await self.ainvoke(input, config=config, **kwargs)
+            return
+        async for chunk in astream(input, config=config, **kwargs):
+            yield chunk
+
+
+async def _wait_overdue(
+    task: asyncio.Task[Any], clock: _AttemptClock, threshold: float
+) -> bool:
+    # Only time spent inside an attempt counts: waits for a rate-limit permit or a
+    # concurrency slot and retry backoff pause the clock instead of triggering a hedge.
+    while not task.done():
+        timeout = None
+        if clock.started_at is not None:
+            timeout = threshold - (time.perf_counter() - clock.started_at)
+            if timeout <= 0:
+                return True
+        clock.changed.clear()
+        changed = asyncio.create_task(clock.changed.wait())
+        try:
+            await asyncio.wait(
+                [task, changed], timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+            )
+        finally:
+            changed.cancel()
+    return False
+
+
+async def _first_success(tasks: list[asyncio.Task[Any]]) -> asyncio.Task[Any]:
+    pending = set(tasks)
+    while True:
+        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        for task in sorted(done, key=lambda t: t.exception() is not None):
+            if task.exception() is None or not pending:
+                return task
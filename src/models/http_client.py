@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from collections.abc import Callable
+from weakref import WeakKeyDictionary
+
+import httpx
+
+
+class LoopLocalTransport(httpx.AsyncBaseTransport):
+    def __init__(self, factory: Callable[[], httpx.AsyncBaseTransport]) -> None:
+        self._factory = factory
+        self._transports: WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncBaseTransport] = (
+            WeakKeyDictionary()
+        )
+        self._lock = threading.Lock()
+
+    def _transport(self) -> httpx.AsyncBaseTransport:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            transport = self._transports.get(loop)
+            if transport is None:
+                transport = self._factory()
+                self._transports[loop] = transport
+            return transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self._transport().handle_async_request(request)
+
+    async def aclose(self) -> None:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            transport = self._transports.pop(loop, None)
+        if transport is not None:
+            await transport.aclose()
+        self.close_all()
+
+    def close_all(self) -> None:
+        with self._lock:
+            transports = list(self._transports.items())
+            self._transports.clear()
+        try:
+            current = asyncio.get_running_loop()
+        except RuntimeError:
+            current = None
+        for loop, transport in transports:
+            if loop.is_closed():
+                continue
+            if loop is current:
+                loop.create_task(transport.aclose())
+            elif loop.is_running():
+                asyncio.run_coroutine_threadsafe(transport.aclose(), loop)
@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+
+from src.models.provider import ChatModel
+
+
+class ModelRegistry:
+    def __init__(self) -> None:
+        self._models: dict[str, tuple[str, ChatModel]] = {}
+
+    def get(self, name: str, fingerprint: str, build: Callable[[], ChatModel]) -> ChatModel:
+        cached = self._models.get(name)
+        if cached is not None and cached[0] == fingerprint:
+            return cached[1]
+        model = build()
+        self._models[name] = (fingerprint, model)
+        return model
+
+    def clear(self) -> None:
+        self._models.clear()
@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from langchain_core.messages import (
+    BaseMessage,
+    BaseMessageChunk,
+    message_chunk_to_message,
+    message_to_dict,
+    messages_from_dict,
+)
+
+from src.models.provider import ChatModel
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    bytes: int
+
+
+class ResponseCache:
+    def __init__(self, directory: Path, ttl_seconds: float, max_bytes: int) -> None:
+        self._dir = directory
+        self._ttl_seconds = ttl_seconds
+        self._max_bytes = max_bytes
+        self._dir.mkdir(parents=True, exist_ok=True)
+        self._index: OrderedDict[str, int] = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        entries = sorted(self._dir.glob("*.json"), key=lambda p: p.stat().st_mtime)
+        for path in entries:
+            size = path.stat().st_size
+            self._index[path.stem] = size
+            self._bytes += size
+
+    async def aget(self, key: str) -> BaseMessage | None:
+        with self._lock:
+            if key not in self._index:
+                self.misses += 1
+                return None
+        return await asyncio.to_thread(self.get, key)
+
+    async def aput(self, key: str, message: BaseMessage) -> None:
+        await asyncio.to_thread(self.put, key, message)
+
+    def get(self, key: str) -> BaseMessage | None:
+        with self._lock:
+            return self._get(key)
+
+    def put(self, key: str, message: BaseMessage) -> None:
+        with self._lock:
+            self._put(key, message)
+
+    def _get(self, key: str) -> BaseMessage | None:
+        path = self._path(key)
+        if key not in self._index or not path.exists():
+            self._forget(key)
+            self.misses += 1
+            return None
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+            created_at = float(data["created_at"])
+            message = messages_from_dict([data["message"]])[0]
+        except Exception:
+            self._remove(key)
+            self.misses += 1
+            return None
+        if time.time() - created_at > self._ttl_seconds:
+            self._remove(key)
+            self.misses += 1
+            return None
+        self._index.move_to_end(key)
+        path.touch()
+        self.hits += 1
+        return message
+
+    def _put(self, key: str, message: BaseMessage) -> None:
+        payload = json.dumps(
+            {"created_at": time.time(), "message": message_to_dict(message)},
+            ensure_ascii=False,
+        )
+        path = self._path(key)
+        path.write_text(payload, encoding="utf-8")
+        self._forget(key)
+        size = path.stat().st_size
+        self._index[key] = size
+        self._bytes += size
+        while self._bytes > self._max_bytes and len(self._index) > 1:
+            oldest = next(iter(self._index))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def stats(self) -> CacheStats:
+        return CacheStats(
+            hits=self.hits,
+            misses=self.misses,
+            evictions=self.evictions,
+            entries=len(self._index),
+            bytes=self._bytes,
+        )
+
+    def _path(self, key: str) -> Path:
+        return self._dir / f"{key}.json"
+
+    def _forget(self, key: str) -> None:
+        size = self._index.pop(key, None)
+        if size is not None:
+            self._bytes -= size
+
+    def _remove(self, key: str) -> None:
+        self._forget(key)
+        self._path(key).unlink(missing_ok=True)
+
+
+def _normalize_message(message: Any) -> Any:
+    if isinstance(message, BaseMessage):
+        return {
+            "type": message.type,
+            "content": message.content,
+            "tool_calls": getattr(message, "tool_calls", None) or [],
+            "tool_call_id": getattr(message, "tool_call_id", None),
+        }
+    return message
+
+
+def make_cache_key(namespace: str, input: Any, kwargs: dict[str, Any]) -> str:
+    if isinstance(input, list):
+        messages: Any = [_normalize_message(m) for m in input]
+    else:
+        messages = _normalize_message(input)
+    raw = json.dumps(
+        {"namespace": namespace, "messages": messages, "kwargs": kwargs},
+        ensure_ascii=False,
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def settings_namespace(model: str, settings: dict[str, Any]) -> str:
+    public = {k: v for k, v in settings.items() if k not in {"api_key", "type"}}
+    return json.dumps({"model": model, **public}, sort_keys=True, default=str)
+
+
+class CachingChatModel:
+    def __init__(self, base_model: ChatModel, cache: ResponseCache, *, namespace: str) -> None:
+        self._base_model = base_model
+        self._cache = cache
+        self._namespace = namespace
+
+    @property
+    def cache(self) -> ResponseCache:
+        return self._cache
+
+    def bind_tools(self, tools: list[Any], **kwargs: Any) -> CachingChatModel:
+        bind_tools = getattr(self._base_model, "bind_tools", None)
+        if not callable(bind_tools):
+            raise AttributeError("base model does not support bind_tools")
+        bound = bind_tools(tools, **kwargs)
+        names = sorted(str(getattr(t, "name", t)) for t in tools)
+        return CachingChatModel(
+            bound,
+            self._cache,
+            namespace=f"{self._namespace}|tools={','.join(names)}",
+        )
+
+    async def ainvoke(
+        self,
+        input: Any,
+        config: Any | None = None,
+        **kwargs: Any,
+    ) -> Any:
+        key = make_cache_key(self._namespace, input, kwargs)
+        cached = await self._cache.aget(key)
+        if cached is not None:
+            cached.response_metadata["cache_hit"] = True
+            return cached
+        result = await self._base_model.ainvoke(input, config=config, **kwargs)
+        if isinstance(result, BaseMessage):
+            await self._cache.aput(key, result)
+        return result
+
+    async def astream(
+        self,
+        input: Any,
+        config: Any | None = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[Any]:
+        key = make_cache_key(self._namespace, input, kwargs)
+        cached = await self._cache.aget(key)
+        if cached is not None:
+            cached.response_metadata["cache_hit"] = True
+            yield cached
+            return
+        astream = getattr(self._base_model, "astream", None)
+        if not callable(astream):
+            result = await self._base_model.ainvoke(input, config=config, **kwargs)
+            if isinstance(result, BaseMessage):
+                await self._cache.aput(key, result)
+            yield result
+            return
+        merged: BaseMessageChunk | None = None
+        async for chunk in astream(input, config=config, **kwargs):
+            if isinstance(chunk, BaseMessageChunk):
+                merged = chunk if merged is None else merged + chunk
+            yield chunk
+        if merged is not None:
+            await self._cache.aput(key, message_chunk_to_message(merged))
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+from src.models.enums import Mode
+from src.models.provider import ChatModel
+
+DEFAULT_MODEL = "chat_model"
+STAGES = ("plan", "chunk", "merge", "final")
+
+
+@dataclass(frozen=True)
+class ModelRouter:
+    default: ChatModel
+    models: dict[str, ChatModel] = field(default_factory=dict)
+    routes: dict[str, dict[str, str]] = field(default_factory=dict)
+
+    def resolve(self, mode: Mode, stage: str) -> ChatModel:
+        for key in (mode.value, "default"):
+            name = self.routes.get(key, {}).get(stage)
+            if name is not None:
+                return self.models.get(name, self.default)
+        return self.default
+
+
+def build_model_router(
+    routing: dict[str, Any],
+    default: ChatModel,
+    init_model: Callable[[str], ChatModel],
+) -> ModelRouter:
+    routes: dict[str, dict[str, str]] = {}
+    models: dict[str, ChatModel] = {DEFAULT_MODEL: default}
+    for key, stages in routing.items():
+        if key != "default" and key not in Mode.__members__:
+            raise ValueError(f"Unknown mode in `models/routing`: {key}")
+        if not isinstance(stages, dict):
+            raise ValueError(f"`models/routing/{key}` must be a mapping of stage to model")
+        for stage, name in stages.items():
+            if stage not in STAGES:
+                raise ValueError(f"Unknown stage in `models/routing/{key}`: {stage}")
+            name = str(name)
+            if name not in models:
+                models[name] = init_model(name)
+            routes.setdefault(key, {})[stage] = name
+    return ModelRouter(default=default, models=models, routes=routes)
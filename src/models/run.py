@@ -33,3 +33,58 @@ class Run(BaseModel):
     error: str | None = None
     document_id: str | None = None
     artifact_id: str | None = None
+    modes: list[Mode] = Field(default_factory=list)
+    artifact_ids: dict[Mode, str] = Field(default_factory=dict)
+    partial: bool = False
+
+
+class ReviewBatch(BaseModel):
+    id: str
+    session_id: str
+    mode: Mode
+    run_ids: list[str]
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class BatchProgress(BaseModel):
+    batch_id: str
+    status: RunStatus
+    total: int
+    queued: int
+    running: int
+    succeeded: int
+    failed: int
+    canceled: int
+    runs: list[Run]
+
+
+class CallMetrics(BaseModel):
+    stage: str
+    seconds: float
+    input_tokens: int
+    output_tokens: int
+    cached_tokens: int
+
+
+class StageMetrics(BaseModel):
+    stage: str
+    seconds: float
+    calls: int
+    input_tokens: int
+    output_tokens: int
+    cached_tokens: int
+
+
+class RunMetrics(BaseModel):
+    run_id: str
+    calls: int
+    input_tokens: int
+    output_tokens: int
+    cached_tokens: int
+    hedges: int = 0
+    hedge_wins: int = 0
+    tool_calls: int = 0
+    tool_cache_hits: int = 0
+    tool_tokens_elided: int = 0
+    stages: list[StageMetrics]
+    call_log: list[CallMetrics]
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any
+
+
+@dataclass(frozen=True)
+class ToolCacheStats:
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    bytes: int
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+def tool_cache_key(name: str, args: dict[str, Any]) -> str:
+    return json.dumps(
+        {"tool": name, "args": args},
+        ensure_ascii=False,
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+
+
+class ToolResultCache:
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 8 * 1024 * 1024) -> None:
+        self._max_entries = max(1, max_entries)
+        self._max_bytes = max_bytes
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> str | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, value = entry
+        if time.monotonic() >= expires_at:
+            self._remove(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: str, value: str, ttl_seconds: float) -> None:
+        if ttl_seconds <= 0:
+            return
+        size = _size(key, value)
+        if size > self._max_bytes:
+            return
+        self._remove(key)
+        self._entries[key] = (time.monotonic() + ttl_seconds, value)
+        self._bytes += size
+        while len(self._entries) > self._max_entries or self._bytes > self._max_bytes:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def stats(self) -> ToolCacheStats:
+        return ToolCacheStats(
+            hits=self.hits,
+            misses=self.misses,
+            evictions=self.evictions,
+            entries=len(self._entries),
+            bytes=self._bytes,
+        )
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= _size(key, entry[1])
+
+
+def _size(key: str, value: str) -> int:
+    return len(key.encode("utf-8")) + len(value.encode("utf-8"))
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from typing import Any
+
+from src.utils.tokens import estimate_tokens
+
+
+@dataclass(frozen=True)
+class CompactedResult:
+    content: str
+    original_tokens: int
+    tokens: int
+
+    @property
+    def elided_tokens(self) -> int:
+        return max(0, self.original_tokens - self.tokens)
+
+
+@dataclass(frozen=True)
+class ToolCompaction:
+    max_result_tokens: int = 2000
+    turn_budget_tokens: int = 6000
+    stale_result_tokens: int = 200
+
+    def result_budget(self, calls: int) -> int:
+        share = self.turn_budget_tokens // max(1, calls)
+        return max(1, min(self.max_result_tokens, share))
+
+    def compact(self, content: str, max_tokens: int) -> CompactedResult:
+        tokens = estimate_tokens(content)
+        if tokens <= max_tokens:
+            return CompactedResult(content=content, original_tokens=tokens, tokens=tokens)
+        out = _trim_json(content, max_tokens)
+        if out is None:
+            out = _truncate_text(content, max_tokens, tokens)
+        return CompactedResult(content=out, original_tokens=tokens, tokens=estimate_tokens(out))
+
+    def stale(self, content: str) -> CompactedResult:
+        tokens = estimate_tokens(content)
+        if tokens <= self.stale_result_tokens:
+            return CompactedResult(content=content, original_tokens=tokens, tokens=tokens)
+        preview = _truncate_text(content, self.stale_result_tokens, tokens)
+        out = f"[earlier tool result, {tokens} tokens, shortened]\n{preview}"
+        return CompactedResult(content=out, original_tokens=tokens, tokens=estimate_tokens(out))
+
+
+def _trim_json(content: str, max_tokens: int) -> str | None:
+    stripped = content.lstrip()
+    if not stripped.startswith(("{", "[")):
+        return None
+    try:
+        value = json.loads(content)
+    except ValueError:
+        return None
+    max_items, max_chars, max_depth = 20, 500, 6
+    while True:
+        out = json.dumps(
+            _trim_value(value, max_items, max_chars, max_depth), ensure_ascii=False
+        )
+        if estimate_tokens(out) <= max_tokens:
+            return out
+        if max_items == 1 and max_chars == 40 and max_depth == 2:
+            return None
+        max_items = max(1, max_items // 2)
+        max_chars = max(40, max_chars // 2)
+        max_depth = max(2, max_depth - 1)
+
+
+def _trim_value(value: Any, max_items: int, max_chars: int, depth: int) -> Any:
+    if isinstance(value, str):
+        if len(value) <= max_chars:
+            return value
+        return f"{value[:max_chars]}…[{len(value) - max_chars} chars elided]"
+    if isinstance(value, dict):
+        if depth <= 0:
+            return f"[object with {len(value)} keys elided]"
+        items = list(value.items())
+        out = {k: _trim_value(v, max_items, max_chars, depth - 1) for k, v in items[:max_items]}
+        if len(items) > max_items:
+            out["…"] = f"{len(items) - max_items} more keys elided"
+        return out
+    if isinstance(value, list):
+        if depth <= 0:
+            return f"[list of {len(value)} items elided]"
+        trimmed = [_trim_value(v, max_items, max_chars, depth - 1) for v in value[:max_items]]
+        if len(value) > max_items:
+            trimmed.append(f"… {len(value) - max_items} more items elided")
+        return trimmed
+    return value
+
+
+def _truncate_text(content: str, max_tokens: int, tokens: int) -> str:
+    keep = max(1, len(content) * max_tokens // max(1, tokens))
+    while True:
+        head = content[: keep * 2 // 3]
+        tail = content[len(content) - keep // 3 :] if keep // 3 else ""
+        out = f"{head}\n…[{len(content) - len(head) - len(tail)} chars elided]…\n{tail}"
+        if estimate_tokens(out) <= max_tokens or keep <= 1:
+            return out
+        keep = keep * 3 // 4
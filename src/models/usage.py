@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any
+
+
+@dataclass(frozen=True)
+class TokenUsage:
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cached_tokens: int = 0
+
+
+@dataclass(frozen=True)
+class CallRecord:
+    stage: str
+    seconds: float
+    usage: TokenUsage
+
+
+class UsageTracker:
+    def __init__(self) -> None:
+        self.calls = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.cached_tokens = 0
+        self.call_log: list[CallRecord] = []
+        self.stage_seconds: dict[str, float] = {}
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.tool_calls = 0
+        self.tool_cache_hits = 0
+        self.tool_tokens_elided = 0
+
+    def record(self, usage: TokenUsage, seconds: float = 0.0, stage: str | None = None) -> None:
+        self.calls += 1
+        self.input_tokens += usage.input_tokens
+        self.output_tokens += usage.output_tokens
+        self.cached_tokens += usage.cached_tokens
+        self.call_log.append(
+            CallRecord(stage=stage or _CURRENT_STAGE.get(), seconds=seconds, usage=usage)
+        )
+
+    def add_stage_time(self, stage: str, seconds: float) -> None:
+        self.stage_seconds[stage] = self.stage_seconds.get(stage, 0.0) + seconds
+
+    @property
+    def cache_hit_rate(self) -> float:
+        if self.input_tokens <= 0:
+            return 0.0
+        return self.cached_tokens / self.input_tokens
+
+
+_CURRENT_TRACKER: ContextVar[UsageTracker | None] = ContextVar("usage_tracker", default=None)
+_CURRENT_STAGE: ContextVar[str] = ContextVar("usage_stage", default="other")
+
+
+def _as_int(value: Any) -> int:
+    return value if isinstance(value, int) else 0
+
+
+def usage_from_message(message: Any) -> TokenUsage | None:
+    usage = getattr(message, "usage_metadata", None)
+    if isinstance(usage, dict) and usage:
+        details = usage.get("input_token_details")
+        cached = details.get("cache_read") if isinstance(details, dict) else None
+        return TokenUsage(
+            input_tokens=_as_int(usage.get("input_tokens")),
+            output_tokens=_as_int(usage.get("output_tokens")),
+            cached_tokens=_as_int(cached),
+        )
+    metadata = getattr(message, "response_metadata", None)
+    token_usage = metadata.get("token_usage") if isinstance(metadata, dict) else None
+    if isinstance(token_usage, dict) and token_usage:
+        details = token_usage.get("prompt_tokens_details")
+        cached = details.get("cached_tokens") if isinstance(details, dict) else None
+        return TokenUsage(
+            input_tokens=_as_int(token_usage.get("prompt_tokens")),
+            output_tokens=_as_int(token_usage.get("completion_tokens")),
+            cached_tokens=_as_int(cached),
+        )
+    return None
+
+
+def record_usage(message: Any, seconds: float = 0.0) -> None:
+    tracker = _CURRENT_TRACKER.get()
+    if tracker is None:
+        return
+    metadata = getattr(message, "response_metadata", None)
+    if isinstance(metadata, dict) and metadata.get("cache_hit"):
+        return
+    tracker.record(usage_from_message(message) or TokenUsage(), seconds=seconds)
+
+
+def current_tracker() -> UsageTracker | None:
+    return _CURRENT_TRACKER.get()
+
+
+def current_stage() -> str:
+    return _CURRENT_STAGE.get()
+
+
+@contextmanager
+def track_usage(tracker: UsageTracker | None = None) -> Iterator[UsageTracker]:
+    active = tracker or _CURRENT_TRACKER.get() or UsageTracker()
+    token = _CURRENT_TRACKER.set(active)
+    try:
+        yield active
+    finally:
+        _CURRENT_TRACKER.reset(token)
+
+
+@contextmanager
+def usage_stage(name: str) -> Iterator[None]:
+    token = _CURRENT_STAGE.set(name)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        tracker = _CURRENT_TRACKER.get()
+        if tracker is not None:
+            tracker.add_stage_time(name, time.perf_counter() - started)
+        _CURRENT_STAGE.reset(token)
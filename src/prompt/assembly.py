@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, replace
+
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
+
+
+@dataclass(frozen=True)
+class PromptLayout:
+    """Assemble model inputs so every call of a run shares a byte-stable prefix.
+
+    The order is always: system prompt, then language, then the plan; only the
+    final human message varies between calls. Providers with prefix caching can
+    then reuse the cached prefix across chunks, stages and sessions.
+    """
+
+    system_prompt: str
+    language: str
+    plan: str | None = None
+    prompt_id: str = ""
+
+    def with_plan(self, plan: str) -> PromptLayout:
+        return replace(self, plan=plan)
+
+    def system_message(self) -> SystemMessage:
+        return SystemMessage(content=f"{self.system_prompt}\n\nLanguage: {self.language}")
+
+    def prefix(self) -> list[BaseMessage]:
+        out: list[BaseMessage] = [self.system_message()]
+        if self.plan is not None:
+            out.append(HumanMessage(content=f"Todo:\n{self.plan}"))
+        return out
+
+    def messages(self, content: str) -> list[BaseMessage]:
+        return [*self.prefix(), HumanMessage(content=content)]
@@ -1,12 +1,111 @@
 from __future__ import annotations
 
+import hashlib
+import threading
+import time
+from dataclasses import dataclass
 from pathlib import Path
 
+from src.config.loader import get_config_section
 from src.models.enums import Mode
 
+_TEMPLATES_DIR = Path(__file__).resolve().parent / "templates"
 
-def get_prompt_text(mode: Mode) -> str:
-    templates_dir = Path(__file__).resolve().parent / "templates"
-    path = templates_dir / f"{mode.value}.md"
-    return path.read_text(encoding="utf-8")
 
+@dataclass(frozen=True)
+class PromptTemplate:
+    mode: Mode
+    text: str
+    sha256: str
+    version: int
+
+    @property
+    def identity(self) -> str:
+        return f"{self.mode.value}@{self.sha256[:16]}"
+
+
+def _stat(path: Path) -> tuple[int, int]:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return (-1, -1)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+class PromptRegistry:
+    def __init__(
+        self,
+        templates_dir: Path = _TEMPLATES_DIR,
+        hot_reload: bool = False,
+        revalidate_interval_s: float = 1.0,
+    ) -> None:
+        self._templates_dir = templates_dir
+        self._hot_reload = hot_reload
+        self._revalidate_interval_s = revalidate_interval_s
+        self._lock = threading.Lock()
+        self._templates: dict[Mode, PromptTemplate] = {}
+        self._signatures: dict[Mode, tuple[int, int]] = {}
+        self._checked_at = 0.0
+        for mode in Mode:
+            self._load(mode)
+
+    def _path(self, mode: Mode) -> Path:
+        return self._templates_dir / f"{mode.value}.md"
+
+    def _load(self, mode: Mode) -> PromptTemplate:
+        path = self._path(mode)
+        signature = _stat(path)
+        text = path.read_text(encoding="utf-8")
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        previous = self._templates.get(mode)
+        if previous is not None and previous.sha256 == digest:
+            template = previous
+        else:
+            version = previous.version + 1 if previous is not None else 1
+            template = PromptTemplate(mode=mode, text=text, sha256=digest, version=version)
+        self._templates[mode] = template
+        self._signatures[mode] = signature
+        return template
+
+    def _revalidate(self) -> None:
+        now = time.monotonic()
+        if now - self._checked_at < self._revalidate_interval_s:
+            return
+        self._checked_at = now
+        for mode in Mode:
+            if _stat(self._path(mode)) != self._signatures.get(mode):
+                self._load(mode)
+
+    def get(self, mode: Mode) -> PromptTemplate:
+        if not self._hot_reload:
+            return self._templates[mode]
+        with self._lock:
+            self._revalidate()
+            return self._templates[mode]
+
+    def reload(self) -> None:
+        with self._lock:
+            for mode in Mode:
+                self._load(mode)
+
+
+_registry: PromptRegistry | None = None
+_registry_lock = threading.Lock()
+
+
+def get_prompt_registry() -> PromptRegistry:
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                settings = get_config_section(["prompts"]) or {}
+                _registry = PromptRegistry(hot_reload=bool(settings.get("hot_reload", False)))
+    return _registry
+
+
+def get_prompt(mode: Mode) -> PromptTemplate:
+    return get_prompt_registry().get(mode)
+
+
+def get_prompt_text(mode: Mode) -> str:
+    return get_prompt(mode).text
@@ -0,0 +1,252 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import random
+from collections.abc import Awaitable, Callable
+from contextlib import AbstractAsyncContextManager, AsyncExitStack
+from dataclasses import dataclass, field
+from typing import Any
+
+from langchain_core.tools import StructuredTool, ToolException
+
+SessionFactory = Callable[[str], AbstractAsyncContextManager[Any]]
+ToolLoader = Callable[[Any], Awaitable[list[Any]]]
+
+_CONNECTION_KEYS = ("url", "headers", "timeout", "sse_read_timeout", "command", "args", "env")
+
+
+@dataclass(frozen=True)
+class MCPServerSettings:
+    name: str
+    connection: dict[str, Any]
+    call_timeout_s: float | None = 60.0
+    max_concurrency: int = 8
+    tool_timeouts: dict[str, float] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class MCPPoolSettings:
+    connect_timeout_s: float = 10.0
+    health_check_interval_s: float = 30.0
+    ping_timeout_s: float = 5.0
+    refresh_interval_s: float = 300.0
+    reconnect_base_delay_s: float = 1.0
+    reconnect_max_delay_s: float = 60.0
+
+
+def parse_mcp_servers(raw: dict[str, Any]) -> list[MCPServerSettings]:
+    servers: list[MCPServerSettings] = []
+    for name, cfg in raw.items():
+        if not isinstance(cfg, dict):
+            continue
+        transport = cfg.get("transport") or cfg.get("type")
+        if not isinstance(transport, str):
+            continue
+        connection = {"transport": transport}
+        connection.update({k: cfg[k] for k in _CONNECTION_KEYS if cfg.get(k) is not None})
+        if "url" not in connection and "command" not in connection:
+            continue
+        timeout = cfg.get("call_timeout_s", 60)
+        tool_timeouts = cfg.get("tool_timeouts") or {}
+        servers.append(
+            MCPServerSettings(
+                name=name,
+                connection=connection,
+                call_timeout_s=float(timeout) if timeout else None,
+                max_concurrency=int(cfg.get("max_concurrency", 8)),
+                tool_timeouts={k: float(v) for k, v in tool_timeouts.items()},
+            )
+        )
+    return servers
+
+
+def parse_pool_settings(raw: dict[str, Any]) -> MCPPoolSettings:
+    defaults = MCPPoolSettings()
+    return MCPPoolSettings(
+        **{
+            name: float(raw.get(name, getattr(defaults, name)))
+            for name in MCPPoolSettings.__dataclass_fields__
+        }
+    )
+
+
+class MCPServerConnection:
+    def __init__(
+        self,
+        settings: MCPServerSettings,
+        pool_settings: MCPPoolSettings,
+        open_session: Callable[[], AbstractAsyncContextManager[Any]],
+        load_tools: ToolLoader,
+    ) -> None:
+        self.settings = settings
+        self._pool_settings = pool_settings
+        self._open_session = open_session
+        self._load_tools = load_tools
+        self._semaphore = asyncio.Semaphore(max(1, settings.max_concurrency))
+        self._ready = asyncio.Event()
+        self._task: asyncio.Task[None] | None = None
+        self._session_tools: dict[str, Any] = {}
+        self.catalog: list[StructuredTool] = []
+        self.healthy = False
+        self.failures = 0
+        self.connects = 0
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def wait_ready(self, timeout: float) -> None:
+        with contextlib.suppress(TimeoutError):
+            await asyncio.wait_for(self._ready.wait(), timeout)
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError, Exception):
+                await task
+        self.healthy = False
+
+    async def call(self, tool_name: str, arguments: dict[str, Any]) -> Any:
+        tool = self._session_tools.get(tool_name)
+        if tool is None or not self.healthy:
+            raise ToolException(f"MCP server unavailable: {self.settings.name}")
+        timeout = self.settings.tool_timeouts.get(tool_name, self.settings.call_timeout_s)
+        async with self._semaphore:
+            try:
+                return await asyncio.wait_for(tool.ainvoke(arguments), timeout)
+            except TimeoutError as e:
+                raise ToolException(f"MCP tool timed out after {timeout}s: {tool_name}") from e
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self._serve()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                pass
+            self.healthy = False
+            self._ready.set()
+            self.failures += 1
+            delay = min(
+                self._pool_settings.reconnect_max_delay_s,
+                self._pool_settings.reconnect_base_delay_s * 2 ** (self.failures - 1),
+            )
+            await asyncio.sleep(delay * random.uniform(0.5, 1.0))
+
+    async def _serve(self) -> None:
+        settings = self._pool_settings
+        loop = asyncio.get_running_loop()
+        async with AsyncExitStack() as stack:
+            session = await asyncio.wait_for(
+                stack.enter_async_context(self._open_session()), settings.connect_timeout_s
+            )
+            await self._refresh(session)
+            self.connects += 1
+            self.healthy = True
+            self.failures = 0
+            self._ready.set()
+            refreshed_at = loop.time()
+            while True:
+                await asyncio.sleep(settings.health_check_interval_s)
+                await asyncio.wait_for(session.send_ping(), settings.ping_timeout_s)
+                if loop.time() - refreshed_at >= settings.refresh_interval_s:
+                    await self._refresh(session)
+                    refreshed_at = loop.time()
+
+    async def _refresh(self, session: Any) -> None:
+        tools = await asyncio.wait_for(
+            self._load_tools(session), self._pool_settings.connect_timeout_s
+        )
+        self._session_tools = {
+            t.name: t for t in tools if isinstance(getattr(t, "name", None), str)
+        }
+        signature = [(t.name, t.description, t.args_schema) for t in self._session_tools.values()]
+        if signature != [(t.name, t.description, t.args_schema) for t in self.catalog]:
+            self.catalog = [self._proxy(t) for t in self._session_tools.values()]
+
+    def _proxy(self, tool: Any) -> StructuredTool:
+        name = tool.name
+
+        async def _call(**arguments: Any) -> Any:
+            return await self.call(name, arguments)
+
+        return StructuredTool(
+            name=name,
+            description=tool.description,
+            args_schema=tool.args_schema,
+            coroutine=_call,
+            metadata={**(tool.metadata or {}), "mcp_server": self.settings.name},
+        )
+
+
+class MCPClientPool:
+    def __init__(
+        self,
+        servers: list[MCPServerSettings],
+        settings: MCPPoolSettings,
+        open_session: SessionFactory,
+        load_tools: ToolLoader,
+    ) -> None:
+        self._settings = settings
+        self._connections = [
+            MCPServerConnection(s, settings, _bind(open_session, s.name), load_tools)
+            for s in servers
+        ]
+        self._catalog: list[Any] = []
+        self._catalog_key: tuple[int, ...] = ()
+        self.loop: asyncio.AbstractEventLoop | None = None
+
+    async def start(self) -> None:
+        if self.loop is None:
+            self.loop = asyncio.get_running_loop()
+            for connection in self._connections:
+                connection.start()
+        await asyncio.gather(
+            *(c.wait_ready(self._settings.connect_timeout_s) for c in self._connections)
+        )
+
+    async def stop(self) -> None:
+        await asyncio.gather(*(c.stop() for c in self._connections))
+
+    def tools(self) -> list[Any]:
+        key = tuple(id(c.catalog) for c in self._connections)
+        if key != self._catalog_key:
+            self._catalog = [t for c in self._connections for t in c.catalog]
+            self._catalog_key = key
+        return self._catalog
+
+    def server_for(self, tool_name: str) -> str | None:
+        for connection in self._connections:
+            if any(t.name == tool_name for t in connection.catalog):
+                return connection.settings.name
+        return None
+
+    def health(self) -> dict[str, bool]:
+        return {c.settings.name: c.healthy for c in self._connections}
+
+
+def _bind(
+    open_session: SessionFactory, name: str
+) -> Callable[[], AbstractAsyncContextManager[Any]]:
+    return lambda: open_session(name)
+
+
+def build_mcp_pool(tools_cfg: dict[str, Any]) -> MCPClientPool | None:
+    servers = parse_mcp_servers(tools_cfg.get("mcp_servers") or {})
+    if not servers:
+        return None
+    try:
+        from langchain_mcp_adapters.client import MultiServerMCPClient  # type: ignore
+        from langchain_mcp_adapters.tools import load_mcp_tools  # type: ignore
+    except Exception:
+        return None
+    client = MultiServerMCPClient({s.name: s.connection for s in servers})
+    return MCPClientPool(
+        servers,
+        parse_pool_settings(tools_cfg.get("pool") or {}),
+        open_session=client.session,
+        load_tools=load_mcp_tools,
+    )
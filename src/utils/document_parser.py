@@ -1,11 +1,17 @@
 from __future__ import annotations
 
+import asyncio
 import os
+from collections.abc import AsyncIterator, Iterator
 from pathlib import Path
 from typing import Any, cast
 
 
 def _docmind_parse_sync(path_str: str) -> str:
+    return "".join(_docmind_stream_sync(path_str))
+
+
+def _docmind_stream_sync(path_str: str) -> Iterator[str]:
     import importlib
     from pathlib import Path
     from typing import Any, cast
@@ -20,10 +26,8 @@ def _docmind_parse_sync(path_str: str) -> str:
     ok = parser.wait_for_completion(task_id, poll_interval=2)
     if not ok:
         raise ValueError("DocMind parse failed")
-    parts: list[str] = []
     for layouts in parser.collect_results_incrementally(task_id, layout_step_size=10):
-        parts.append(parser.generate_markdown(layouts))
-    return "".join(parts)
+        yield parser.generate_markdown(layouts)
 
 
 def _docmind_parse_via_subprocess(path_str: str) -> str:
@@ -59,6 +63,45 @@ def _docmind_parse_worker(conn: Any, path_str: str) -> None:
         conn.close()
 
 
+async def _docmind_stream_via_subprocess(path_str: str) -> AsyncIterator[str]:
+    import multiprocessing
+
+    ctx = multiprocessing.get_context("spawn")
+    parent_conn, child_conn = ctx.Pipe(duplex=False)
+
+    proc = ctx.Process(target=_docmind_stream_worker, args=(child_conn, path_str))
+    proc.start()
+    child_conn.close()
+    try:
+        while True:
+            result = await asyncio.to_thread(parent_conn.recv)
+            if not (isinstance(result, tuple) and len(result) == 2):
+                raise ValueError("Invalid DocMind worker result")
+            kind, payload = result
+            if kind == "part" and isinstance(payload, str):
+                yield payload
+            elif kind == "done":
+                return
+            else:
+                raise ValueError(str(payload))
+    finally:
+        if proc.is_alive():
+            proc.terminate()
+        await asyncio.to_thread(proc.join)
+        parent_conn.close()
+
+
+def _docmind_stream_worker(conn: Any, path_str: str) -> None:
+    try:
+        for part in _docmind_stream_sync(path_str):
+            conn.send(("part", part))
+        conn.send(("done", ""))
+    except Exception as e:
+        conn.send(("error", str(e)))
+    finally:
+        conn.close()
+
+
 class DocumentParser:
     async def parse(self, path: Path) -> str:
         if path.suffix.lower() in {".md", ".txt"}:
@@ -67,8 +110,20 @@ class DocumentParser:
             raise ValueError("DocMind parsing is not enabled")
         return await self._parse_with_docmind(path)
 
+    async def stream(self, path: Path) -> AsyncIterator[str]:
+        if path.suffix.lower() in {".md", ".txt"}:
+            yield path.read_text(encoding="utf-8", errors="ignore")
+            return
+        if os.getenv("DOCMIND_ENABLED") != "1":
+            raise ValueError("DocMind parsing is not enabled")
+        async for part in self._stream_with_docmind(path):
+            yield part
+
+    async def _stream_with_docmind(self, path: Path) -> AsyncIterator[str]:
+        async for part in _docmind_stream_via_subprocess(str(path)):
+            yield part
+
     async def _parse_with_docmind(self, path: Path) -> str:
-        import asyncio
         import threading
 
         if threading.current_thread() is threading.main_thread():
@@ -57,13 +57,29 @@ class FileStore:
         session_id: str | None = None,
         run_id: str | None = None,
         source_document_id: str | None = None,
+    ) -> StoreResult:
+        result = self.create_review(
+            filename,
+            session_id=session_id,
+            run_id=run_id,
+            source_document_id=source_document_id,
+        )
+        Path(result.manifest.path).write_text(markdown, encoding="utf-8")
+        return result
+
+    def create_review(
+        self,
+        filename: str,
+        session_id: str | None = None,
+        run_id: str | None = None,
+        source_document_id: str | None = None,
     ) -> StoreResult:
         now = datetime.utcnow()
         expires_at = now + self._ttl
         artifact_id = uuid.uuid4().hex
         safe_name = filename if filename.endswith(".md") else f"{filename}.md"
         path = self._reviews_dir / f"{artifact_id}__{safe_name}"
-        path.write_text(markdown, encoding="utf-8")
+        path.write_text("", encoding="utf-8")
         manifest = StoredFileManifest(
             id=artifact_id,
             kind="review",
@@ -77,6 +93,13 @@ class FileStore:
         self._write_manifest(manifest)
         return StoreResult(manifest=manifest)
 
+    def append_review(self, manifest: StoredFileManifest, text: str) -> None:
+        with open(manifest.path, "a", encoding="utf-8") as f:
+            f.write(text)
+
+    def write_review(self, manifest: StoredFileManifest, markdown: str) -> None:
+        Path(manifest.path).write_text(markdown, encoding="utf-8")
+
     def get_manifest(self, kind: str, file_id: str) -> StoredFileManifest | None:
         manifest_path = self._manifests_dir / f"{kind}__{file_id}.json"
         if not manifest_path.exists():
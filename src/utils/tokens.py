@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+import math
+import re
+from collections.abc import Callable
+from functools import lru_cache
+
+_CJK_RE = re.compile(r"[　-〿぀-ヿ㐀-䶿一-鿿＀-￯]")
+
+
+@lru_cache(maxsize=1)
+def _get_encoder() -> Callable[[str], list[int]] | None:
+    try:
+        import tiktoken
+    except Exception:
+        return None
+    try:
+        encoding = tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        return None
+
+    def _encode(text: str) -> list[int]:
+        tokens: list[int] = encoding.encode(text, disallowed_special=())
+        return tokens
+
+    return _encode
+
+
+def estimate_tokens(text: str) -> int:
+    if not text:
+        return 0
+    encode = _get_encoder()
+    if encode is not None:
+        return len(encode(text))
+    cjk = len(_CJK_RE.findall(text))
+    return cjk + math.ceil((len(text) - cjk) / 4)
@@ -0,0 +1,226 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from datetime import timedelta
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+from langchain_core.messages import AIMessage, BaseMessage
+
+from src.agent.review_handler import ReviewRecord, ReviewService
+from src.api.batch_store import InMemoryBatchStore
+from src.api.run_store import InMemoryRunStore
+from src.api.scheduler import RunScheduler
+from src.api.session_store import InMemorySessionStore
+from src.cli.server import create_app
+from src.models.enums import Mode
+from src.models.usage import TokenUsage, track_usage, usage_stage
+from src.utils.file_store import FileStore
+
+
+def test_get_run_metrics_aggregates_by_stage() -> None:
+    app = create_app()
+    store = InMemoryRunStore()
+    run = store.create(session_id="s", mode=Mode.prd_review)
+    with track_usage(store.usage(run.id)) as usage:
+        with usage_stage("planning"):
+            usage.record(TokenUsage(100, 10, 0), seconds=0.5)
+        with usage_stage("executing"):
+            usage.record(TokenUsage(120, 20, 90), seconds=1.0)
+            usage.record(TokenUsage(80, 30, 60), seconds=1.5)
+
+    from src.api import deps
+
+    app.dependency_overrides[deps.get_run_store] = lambda: store
+    client = TestClient(app)
+
+    resp = client.get(f"/api/runs/{run.id}/metrics")
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["calls"] == 3
+    assert data["input_tokens"] == 300
+    assert data["cached_tokens"] == 150
+    stages = {s["stage"]: s for s in data["stages"]}
+    assert stages["planning"]["calls"] == 1
+    assert stages["executing"]["calls"] == 2
+    assert stages["executing"]["output_tokens"] == 50
+    assert [c["seconds"] for c in data["call_log"]] == [0.5, 1.0, 1.5]
+
+    assert client.get("/api/runs/missing/metrics").status_code == 404
+
+
+class _BatchModel:
+    async def ainvoke(
+        self,
+        input: list[BaseMessage],
+        config: object | None = None,
+        **kwargs: object,
+    ) -> AIMessage:
+        text = str(input[-1].content)
+        if "Document:" in text:
+            return AIMessage(content="[{\"id\": \"T1\", \"title\": \"t1\"}]")
+        if "Content:" in text:
+            return AIMessage(content="{\"covered\": [\"T1\"], \"markdown\": \"ok\"}")
+        return AIMessage(content="final")
+
+
+def test_review_batch_runs_through_shared_scheduler(tmp_path: Path) -> None:
+    app = create_app()
+
+    from src.api import deps
+
+    sessions = InMemorySessionStore()
+    app.dependency_overrides[deps.get_session_store] = lambda: sessions
+    runs = InMemoryRunStore()
+    app.dependency_overrides[deps.get_run_store] = lambda: runs
+    batches = InMemoryBatchStore()
+    app.dependency_overrides[deps.get_batch_store] = lambda: batches
+    scheduler = RunScheduler(max_concurrent_runs=1)
+    app.dependency_overrides[deps.get_run_scheduler] = lambda: scheduler
+    store = FileStore(base_dir=tmp_path, ttl=timedelta(days=1))
+    app.dependency_overrides[deps.get_file_store] = lambda: store
+    service = ReviewService(model=_BatchModel())
+    app.dependency_overrides[deps.get_review_service] = lambda: service
+    session = sessions.create_session(mode=Mode.tc_review, language="zh")
+
+    with TestClient(app) as client:
+        resp = client.post(
+            "/api/review-batches",
+            json={"session_id": session.id, "items": [{"text": "a"}, {"text": "b"}, {}]},
+        )
+        assert resp.status_code == 200
+        batch_id = resp.json()["batch_id"]
+        assert len(resp.json()["run_ids"]) == 3
+
+        for _ in range(100):
+            progress = client.get(f"/api/review-batches/{batch_id}").json()
+            if progress["status"] != "running":
+                break
+            time.sleep(0.01)
+
+    assert progress["total"] == 3
+    assert progress["succeeded"] == 2
+    assert progress["failed"] == 1
+    assert progress["status"] == "failed"
+    assert client.get("/api/review-batches/missing").status_code == 404
+
+
+def test_review_with_multiple_modes_writes_one_artifact_per_mode(tmp_path: Path) -> None:
+    app = create_app()
+
+    from src.api import deps
+
+    sessions = InMemorySessionStore()
+    app.dependency_overrides[deps.get_session_store] = lambda: sessions
+    runs = InMemoryRunStore()
+    app.dependency_overrides[deps.get_run_store] = lambda: runs
+    scheduler = RunScheduler(max_concurrent_runs=1)
+    app.dependency_overrides[deps.get_run_scheduler] = lambda: scheduler
+    store = FileStore(base_dir=tmp_path, ttl=timedelta(days=1))
+    app.dependency_overrides[deps.get_file_store] = lambda: store
+    service = ReviewService(model=_BatchModel())
+    app.dependency_overrides[deps.get_review_service] = lambda: service
+    session = sessions.create_session(mode=Mode.prd_review, language="zh")
+
+    with TestClient(app) as client:
+        resp = client.post(
+            "/api/reviews",
+            json={"session_id": session.id, "text": "a", "modes": ["prd_review", "trd_review"]},
+        )
+        assert resp.status_code == 200
+        run_id = resp.json()["run_id"]
+        for _ in range(100):
+            run = client.get(f"/api/runs/{run_id}").json()
+            if run["status"] != "running":
+                break
+            time.sleep(0.01)
+        events = client.get(f"/api/runs/{run_id}/events").json()
+
+    assert run["status"] == "succeeded"
+    assert run["modes"] == ["prd_review", "trd_review"]
+    outputs = [e for e in events if e["type"] == "output"]
+    assert {e["mode"] for e in outputs} == {"prd_review", "trd_review"}
+    assert set(run["artifact_ids"]) == {"prd_review", "trd_review"}
+    assert run["artifact_id"] == run["artifact_ids"]["prd_review"]
+
+
+class _HangingModel:
+    def __init__(self) -> None:
+        self.started = False
+        self.cancelled = False
+
+    async def ainvoke(
+        self,
+        input: list[BaseMessage],
+        config: object | None = None,
+        **kwargs: object,
+    ) -> AIMessage:
+        self.started = True
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return AIMessage(content="late")
+
+
+def test_cancel_run_aborts_in_flight_model_call(tmp_path: Path) -> None:
+    app = create_app()
+
+    from src.api import deps
+
+    sessions = InMemorySessionStore()
+    app.dependency_overrides[deps.get_session_store] = lambda: sessions
+    runs = InMemoryRunStore()
+    app.dependency_overrides[deps.get_run_store] = lambda: runs
+    scheduler = RunScheduler(max_concurrent_runs=1)
+    app.dependency_overrides[deps.get_run_scheduler] = lambda: scheduler
+    model = _HangingModel()
+    service = ReviewService(model=model)
+    app.dependency_overrides[deps.get_review_service] = lambda: service
+    session = sessions.create_session(mode=Mode.prd_review, language="zh")
+
+    with TestClient(app) as client:
+        resp = client.post("/api/reviews", json={"session_id": session.id, "text": "a"})
+        run_id = resp.json()["run_id"]
+        for _ in range(100):
+            if model.started:
+                break
+            time.sleep(0.01)
+        assert client.post(f"/api/runs/{run_id}/cancel").json()["status"] == "canceled"
+        for _ in range(100):
+            if scheduler.active == 0:
+                break
+            time.sleep(0.01)
+
+    assert model.cancelled
+    assert scheduler.active == 0
+    item = runs.get(run_id)
+    assert item is not None and item.task is not None and item.task.cancelled()
+
+
+def test_review_rejects_previous_run_of_a_different_mode() -> None:
+    app = create_app()
+
+    from src.api import deps
+
+    sessions = InMemorySessionStore()
+    app.dependency_overrides[deps.get_session_store] = lambda: sessions
+    runs = InMemoryRunStore()
+    app.dependency_overrides[deps.get_run_store] = lambda: runs
+    session = sessions.create_session(mode=Mode.prd_review, language="zh")
+    previous = runs.create(session_id=session.id, mode=Mode.prd_review)
+    runs.set_review_record(previous.id, ReviewRecord(mode=Mode.prd_review))
+
+    resp = TestClient(app).post(
+        "/api/reviews",
+        json={
+            "session_id": session.id,
+            "text": "a",
+            "modes": ["trd_review"],
+            "previous_run_id": previous.id,
+        },
+    )
+
+    assert resp.status_code == 400
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+from src.agent.budget import LatencyStats, plan_budget
+
+
+def test_plan_budget_scales_parallelism_and_chunk_size_to_deadline() -> None:
+    latency = LatencyStats(defaults={"plan": 10.0, "chunk": 10.0, "final": 10.0})
+
+    relaxed = plan_budget(
+        time_budget_s=600,
+        document_tokens=6000,
+        chunk_tokens=1500,
+        max_concurrency=2,
+        max_budget_concurrency=8,
+        latency=latency,
+        now=100.0,
+    )
+    assert relaxed.deadline == 700.0
+    assert not relaxed.skip_planning
+    assert (relaxed.concurrency, relaxed.chunk_tokens) == (2, 1500)
+
+    tight = plan_budget(
+        time_budget_s=25,
+        document_tokens=30000,
+        chunk_tokens=1500,
+        max_concurrency=2,
+        max_budget_concurrency=8,
+        latency=latency,
+        now=0.0,
+    )
+    assert tight.skip_planning
+    assert tight.concurrency == 8
+    assert tight.chunk_tokens == 3750
+
+
+def test_latency_stats_moves_towards_observations() -> None:
+    latency = LatencyStats(alpha=0.5, defaults={"chunk": 10.0})
+    latency.observe("chunk", 2.0)
+    assert latency.estimate("chunk") == 6.0
+    assert latency.estimate("final") == 6.0
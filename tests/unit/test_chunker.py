@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+from src.agent.chunker import TokenChunker
+
+
+def _count(text: str) -> int:
+    return len(text)
+
+
+def test_token_chunker_short_text_is_single_chunk() -> None:
+    chunker = TokenChunker(max_tokens=100, count_tokens=_count)
+    assert chunker.split("短文本") == ["短文本"]
+    assert chunker.split("  \n") == []
+
+
+def test_token_chunker_prefers_cjk_sentence_boundaries() -> None:
+    chunker = TokenChunker(max_tokens=12, count_tokens=_count)
+    text = "第一句话很短。第二句话也短！第三句呢？第四句结束。"
+    chunks = chunker.split(text)
+    assert "".join(chunks) == text
+    assert all(len(c) <= 12 for c in chunks)
+    assert all(c.endswith(("。", "！", "？")) for c in chunks)
+
+
+def test_token_chunker_breaks_at_headings_and_overlaps() -> None:
+    chunker = TokenChunker(max_tokens=30, overlap_tokens=12, count_tokens=_count)
+    s1, s2, s3 = "需求一二三四五六七八。", "需求四五六七八九十。", "需求七八九十一二三四。"
+    text = f"# 概述\n\n背景说明一二三四五。\n\n# 需求\n\n{s1}{s2}{s3}"
+    chunks = chunker.split(text)
+    assert chunks == ["# 概述\n\n背景说明一二三四五。", f"# 需求\n\n{s1}{s2}", f"{s2}{s3}"]
+
+
+def test_token_chunker_hard_splits_oversized_sentence() -> None:
+    chunker = TokenChunker(max_tokens=5, count_tokens=_count)
+    chunks = chunker.split("x" * 23)
+    assert "".join(chunks) == "x" * 23
+    assert all(len(c) <= 5 for c in chunks)
+
+
+def test_token_chunker_counts_block_separators() -> None:
+    chunker = TokenChunker(max_tokens=19, count_tokens=_count)
+    text = "\n\n".join(["一二三四五六七八九"] * 3)
+    chunks = chunker.split(text)
+    assert chunks == ["一二三四五六七八九"] * 3
+
+
+def test_token_chunker_boundaries_survive_insertions_without_headings() -> None:
+    chunker = TokenChunker(max_tokens=120, count_tokens=_count)
+    paragraphs = [f"第{i}段说明需求细节，" + "内容" * (5 + i % 7) + "。" for i in range(60)]
+    before = chunker.split("\n\n".join(paragraphs))
+    edited = paragraphs[:3] + ["新增段落甲，补充说明。", "新增段落乙，补充说明。"] + paragraphs[3:]
+    after = chunker.split("\n\n".join(edited))
+    assert len(before) >= 9
+    reused = sum(1 for c in after if c in set(before))
+    assert reused >= len(before) - 2
@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+import asyncio
+
+from src.models.concurrency import LoopLocalSemaphore
+
+
+def test_loop_local_semaphore_works_across_event_loops() -> None:
+    semaphore = LoopLocalSemaphore(1)
+    peak = [0, 0]
+
+    async def _hold() -> None:
+        async with semaphore:
+            peak[0] += 1
+            peak[1] = max(peak[1], peak[0])
+            await asyncio.sleep(0.01)
+            peak[0] -= 1
+
+    async def _contend() -> None:
+        await asyncio.gather(_hold(), _hold(), _hold())
+
+    asyncio.run(_contend())
+    asyncio.run(_contend())
+
+    assert peak[1] == 1
@@ -45,3 +45,34 @@ def test_merge_and_env_resolution(tmp_path: Path, monkeypatch: MonkeyPatch) -> N
     raw = loader.load_raw_config()
     assert raw["models"]["chat_model"]["api_key"] == "abc"
     assert raw["models"]["chat_model"]["temperature"] == 0.7
+
+
+def test_config_service_caches_and_reloads_on_change(
+    tmp_path: Path, monkeypatch: MonkeyPatch
+) -> None:
+    project_path = tmp_path / "project.yaml"
+    project_path.write_text(yaml.safe_dump({"review": {"max_concurrency": 1}}), encoding="utf-8")
+    monkeypatch.setattr(loader, "get_global_config_path", lambda: tmp_path / "missing.yaml")
+    monkeypatch.setattr(loader, "get_project_config_path", lambda: project_path)
+    reads: list[Path] = []
+    read_yaml = loader._read_yaml
+
+    def _counting_read(path: Path) -> dict[str, object]:
+        reads.append(path)
+        return read_yaml(path)
+
+    monkeypatch.setattr(loader, "_read_yaml", _counting_read)
+    service = loader.ConfigService(revalidate_interval_s=0)
+    changes: list[dict[str, object]] = []
+    service.subscribe(changes.append)
+
+    first = service.get()
+    assert service.get() is first
+    assert len(reads) == 2
+
+    project_path.write_text(
+        yaml.safe_dump({"review": {"max_concurrency": 12}}), encoding="utf-8"
+    )
+    second = service.get()
+    assert second["review"] == {"max_concurrency": 12}
+    assert changes == [second]
@@ -0,0 +1,18 @@
+from __future__ import annotations
+
+from src.agent.dedup import MinHashIndex
+
+_TABLE = (
+    "| 步骤 | 操作 | 预期结果 |\n"
+    "| 1 | 打开登录页 | 页面正常展示 |\n"
+    "| 2 | 输入账号密码 | 登录成功并跳转首页 |\n"
+)
+
+
+def test_minhash_index_matches_near_duplicates_only() -> None:
+    index = MinHashIndex(threshold=0.8)
+
+    assert index.add(0, _TABLE) is None
+    assert index.add(1, _TABLE.replace("首页", "主页")) == 0
+    assert index.add(2, "接口返回的错误码需要在文档中逐一说明含义与处理方式。") is None
+    assert index.add(3, _TABLE + "\n") == 0
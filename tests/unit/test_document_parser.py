@@ -3,13 +3,14 @@ from __future__ import annotations
 import asyncio
 import sys
 import types
-from collections.abc import Iterator
+from collections.abc import AsyncIterator, Iterator
 from pathlib import Path
 from typing import Any, cast
 
 import pytest
 from _pytest.monkeypatch import MonkeyPatch
 
+from src.utils import document_parser
 from src.utils.document_parser import DocumentParser
 
 
@@ -75,3 +76,50 @@ def test_document_parser_docmind_path_joins_markdown(
     parser = DocumentParser()
     out = asyncio.run(parser.parse(p))
     assert out == "ab"
+
+
+def test_document_parser_stream_yields_docmind_parts(
+    tmp_path: Path,
+    monkeypatch: MonkeyPatch,
+) -> None:
+    p = tmp_path / "a.pdf"
+    p.write_bytes(b"%PDF")
+
+    mod = types.ModuleType("src.utils.aili_doc_parser")
+
+    class FakeDocParser:
+        def submit_job(
+            self, file_path: str, file_name: str | None = None
+        ) -> str | None:
+            return "tid"
+
+        def wait_for_completion(self, task_id: str, poll_interval: int = 5) -> bool:
+            return True
+
+        def collect_results_incrementally(
+            self, task_id: str, layout_step_size: int = 10
+        ) -> Iterator[list[str]]:
+            yield ["a"]
+            yield ["b"]
+
+        def generate_markdown(self, layouts: list[str]) -> str:
+            return "".join(layouts) + "\n"
+
+    mod_any = cast(Any, mod)
+    mod_any.DocParser = FakeDocParser
+    monkeypatch.setenv("DOCMIND_ENABLED", "1")
+    monkeypatch.setitem(sys.modules, "src.utils.aili_doc_parser", mod)
+    spawned: list[str] = []
+
+    async def _inline_worker(path_str: str) -> AsyncIterator[str]:
+        spawned.append(path_str)
+        for part in document_parser._docmind_stream_sync(path_str):
+            yield part
+
+    monkeypatch.setattr(document_parser, "_docmind_stream_via_subprocess", _inline_worker)
+
+    async def _collect() -> list[str]:
+        return [part async for part in DocumentParser().stream(p)]
+
+    assert asyncio.run(_collect()) == ["a\n", "b\n"]
+    assert spawned == [str(p)]
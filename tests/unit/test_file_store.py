@@ -18,3 +18,17 @@ def test_save_and_cleanup(tmp_path: Path) -> None:
     removed = store.cleanup_expired(now=datetime.utcnow() + timedelta(days=2))
     assert removed == 2
 
+
+
+def test_create_and_append_review(tmp_path: Path) -> None:
+    store = FileStore(base_dir=tmp_path, ttl=timedelta(days=1))
+    review = store.create_review("r.md", run_id="run")
+    store.append_review(review.manifest, "# a")
+    store.append_review(review.manifest, "b")
+
+    manifest = store.get_manifest("review", review.manifest.id)
+    assert manifest is not None and manifest.run_id == "run"
+    assert Path(manifest.path).read_text(encoding="utf-8") == "# ab"
+
+    store.write_review(review.manifest, "# final")
+    assert Path(manifest.path).read_text(encoding="utf-8") == "# final"
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import asyncio
+
+import httpx
+import openai
+from langchain_core.messages import AIMessage, HumanMessage
+
+from src.models.chat_model import RateLimitedChatModel, RateLimiter, get_hedge_policy
+from src.models.concurrency import ConcurrencyLimitedChatModel
+from src.models.hedging import HedgedChatModel, HedgePolicy, HedgeStats
+from src.models.usage import track_usage, usage_stage
+
+
+class _SlowFirstModel:
+    def __init__(self) -> None:
+        self.calls = 0
+        self.cancelled = 0
+
+    async def ainvoke(
+        self,
+        input: object,
+        config: object | None = None,
+        **kwargs: object,
+    ) -> AIMessage:
+        self.calls += 1
+        call = self.calls
+        try:
+            await asyncio.sleep(0.2 if call == 1 else 0)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return AIMessage(content=f"call {call}")
+
+
+def _policy(max_fraction: float) -> HedgePolicy:
+    policy = HedgePolicy(percentile=0.5, min_samples=2, max_fraction=max_fraction)
+    policy.observe("chunk", 0.01)
+    policy.observe("chunk", 0.02)
+    return policy
+
+
+def test_hedged_model_takes_faster_duplicate_and_cancels_loser() -> None:
+    base = _SlowFirstModel()
+    model = HedgedChatModel(base, _policy(max_fraction=1.0))
+
+    async def _run() -> tuple[object, int]:
+        with track_usage() as usage, usage_stage("chunk"):
+            out = await model.ainvoke([HumanMessage(content="x")])
+        return out, usage.hedge_wins
+
+    out, wins = asyncio.run(_run())
+
+    assert getattr(out, "content", None) == "call 2"
+    assert wins == 1
+    assert base.cancelled == 1
+    assert model.policy.stats() == HedgeStats(requests=1, hedged=1, hedge_wins=1)
+
+
+def test_hedged_model_respects_hedge_fraction_cap() -> None:
+    base = _SlowFirstModel()
+    model = HedgedChatModel(base, _policy(max_fraction=0.0))
+
+    async def _run() -> object:
+        with usage_stage("chunk"):
+            return await model.ainvoke([HumanMessage(content="x")])
+
+    out = asyncio.run(_run())
+
+    assert getattr(out, "content", None) == "call 1"
+    assert base.calls == 1
+    assert model.policy.stats().hedged == 0
+
+
+def test_hedge_policy_is_rebuilt_when_settings_change() -> None:
+    first = get_hedge_policy("m", {"enabled": True, "percentile": 0.9})
+    assert get_hedge_policy("m", {"enabled": True, "percentile": 0.9}) is first
+    changed = get_hedge_policy("m", {"enabled": True, "percentile": 0.99})
+    assert changed is not first
+    assert changed._percentile == 0.99
+
+
+class _FastModel:
+    def __init__(self, errors: int = 0) -> None:
+        self.calls = 0
+        self.errors = errors
+
+    async def ainvoke(
+        self,
+        input: object,
+        config: object | None = None,
+        **kwargs: object,
+    ) -> AIMessage:
+        self.calls += 1
+        if self.calls <= self.errors:
+            response = httpx.Response(
+                503,
+                headers={"retry-after-ms": "150"},
+                request=httpx.Request("POST", "http://provider/v1/chat/completions"),
+            )
+            raise openai.InternalServerError("boom", response=response, body=None)
+        return AIMessage(content="ok")
+
+
+def test_hedge_timer_ignores_concurrency_slot_waits() -> None:
+    base = _FastModel()
+    semaphore = asyncio.Semaphore(1)
+    model = HedgedChatModel(ConcurrencyLimitedChatModel(base, semaphore), _policy(1.0))
+
+    async def _run() -> object:
+        async def _hold_slot() -> None:
+            async with semaphore:
+                await asyncio.sleep(0.15)
+
+        holder = asyncio.create_task(_hold_slot())
+        await asyncio.sleep(0)
+        with usage_stage("chunk"):
+            out = await model.ainvoke([HumanMessage(content="x")])
+        await holder
+        return out
+
+    out = asyncio.run(_run())
+
+    assert getattr(out, "content", None) == "ok"
+    assert base.calls == 1
+    assert model.policy.stats().hedged == 0
+    assert model.policy.threshold("chunk") < 0.1
+
+
+def test_hedge_timer_ignores_retry_backoff() -> None:
+    base = _FastModel(errors=1)
+    limited = RateLimitedChatModel(base, RateLimiter(requests_per_minute=600), max_retries=3)
+    model = HedgedChatModel(limited, _policy(1.0))
+
+    async def _run() -> object:
+        with usage_stage("chunk"):
+            return await model.ainvoke([HumanMessage(content="x")])
+
+    out = asyncio.run(_run())
+
+    assert getattr(out, "content", None) == "ok"
+    assert base.calls == 2
+    assert model.policy.stats().hedged == 0
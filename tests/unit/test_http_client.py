@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import asyncio
+
+import httpx
+
+from src.models import chat_model
+from src.models.http_client import LoopLocalTransport
+
+
+class _Transport(httpx.AsyncBaseTransport):
+    def __init__(self) -> None:
+        self.loop = asyncio.get_running_loop()
+        self.closed = False
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        assert asyncio.get_running_loop() is self.loop
+        return httpx.Response(200, text="ok")
+
+    async def aclose(self) -> None:
+        self.closed = True
+
+
+def test_loop_local_transport_uses_one_pool_per_event_loop() -> None:
+    created: list[_Transport] = []
+
+    def _factory() -> _Transport:
+        created.append(_Transport())
+        return created[-1]
+
+    client = httpx.AsyncClient(transport=LoopLocalTransport(_factory))
+
+    async def _get() -> str:
+        first = await client.get("http://provider/v1")
+        second = await client.get("http://provider/v1")
+        return first.text + second.text
+
+    assert asyncio.run(_get()) == "okok"
+    assert asyncio.run(_get()) == "okok"
+    assert len(created) == 2
+
+
+def test_get_http_client_closes_superseded_client() -> None:
+    async def _run() -> None:
+        first = chat_model.get_http_client({"max_connections": 5})
+        assert chat_model.get_http_client({"max_connections": 5}) is first
+        transport = first._transport
+        assert isinstance(transport, LoopLocalTransport)
+        transport._transport()
+        second = chat_model.get_http_client({"max_connections": 6})
+        assert second is not first
+        assert not transport._transports
+
+    asyncio.run(_run())
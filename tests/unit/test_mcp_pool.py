@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Any
+
+import pytest
+from langchain_core.tools import StructuredTool, ToolException
+
+from src.models import chat_model
+from src.tools.mcp.pool import (
+    MCPClientPool,
+    MCPPoolSettings,
+    MCPServerSettings,
+    parse_mcp_servers,
+)
+
+
+class _Session:
+    def __init__(self, alive: bool = True) -> None:
+        self.alive = alive
+
+    async def send_ping(self) -> None:
+        if not self.alive:
+            raise ConnectionError("gone")
+
+
+def _tool(name: str, delay: float, session: _Session) -> StructuredTool:
+    async def _call(q: str) -> str:
+        await asyncio.sleep(delay)
+        return f"{name}:{q}:{id(session)}"
+
+    return StructuredTool.from_function(coroutine=_call, name=name, description=name)
+
+
+def test_parse_mcp_servers_accepts_type_alias() -> None:
+    servers = parse_mcp_servers(
+        {
+            "a": {"type": "sse", "url": "http://x/sse", "tool_timeouts": {"t": 2}, "cache": {}},
+            "b": {"url": "http://y"},
+        }
+    )
+    assert [s.name for s in servers] == ["a"]
+    assert servers[0].connection == {"transport": "sse", "url": "http://x/sse"}
+    assert servers[0].tool_timeouts == {"t": 2.0}
+
+
+def test_pool_reconnects_and_enforces_tool_timeouts() -> None:
+    sessions: list[_Session] = []
+    attempts = 0
+
+    @asynccontextmanager
+    async def _open(name: str) -> AsyncIterator[_Session]:
+        nonlocal attempts
+        attempts += 1
+        if attempts == 1:
+            raise ConnectionError("refused")
+        session = _Session()
+        sessions.append(session)
+        yield session
+
+    async def _load(session: Any) -> list[Any]:
+        return [_tool("lookup", 0.0, session), _tool("slow", 1.0, session)]
+
+    settings = MCPPoolSettings(
+        connect_timeout_s=1.0,
+        health_check_interval_s=0.01,
+        reconnect_base_delay_s=0.01,
+        reconnect_max_delay_s=0.01,
+    )
+    server = MCPServerSettings(
+        name="s", connection={}, call_timeout_s=1.0, tool_timeouts={"slow": 0.05}
+    )
+    pool = MCPClientPool([server], settings, open_session=_open, load_tools=_load)
+
+    async def _run() -> None:
+        await pool.start()
+        while not pool.health()["s"]:
+            await asyncio.sleep(0.01)
+        tools = {t.name: t for t in pool.tools()}
+        assert pool.server_for("lookup") == "s"
+        assert await tools["lookup"].ainvoke({"q": "a"}) == f"lookup:a:{id(sessions[0])}"
+        with pytest.raises(ToolException, match="timed out"):
+            await tools["slow"].ainvoke({"q": "a"})
+
+        sessions[0].alive = False
+        while len(sessions) < 2 or not pool.health()["s"]:
+            await asyncio.sleep(0.01)
+        assert await tools["lookup"].ainvoke({"q": "b"}) == f"lookup:b:{id(sessions[1])}"
+        await pool.stop()
+
+    asyncio.run(_run())
+
+
+class _FakePool:
+    def __init__(self) -> None:
+        self.stopped = False
+
+    async def stop(self) -> None:
+        self.stopped = True
+
+
+def test_get_mcp_pool_keeps_one_pool_per_event_loop(monkeypatch: pytest.MonkeyPatch) -> None:
+    config: dict[str, Any] = {"mcp_servers": {"s": {"transport": "sse", "url": "http://x"}}}
+    monkeypatch.setattr(chat_model, "get_config_section", lambda path: config)
+    monkeypatch.setattr(chat_model, "build_mcp_pool", lambda cfg: _FakePool())
+    monkeypatch.setattr(chat_model, "_MCP_POOLS", {})
+    other = asyncio.new_event_loop()
+    thread = threading.Thread(target=other.run_forever, daemon=True)
+    thread.start()
+
+    def _on_other() -> Any:
+        return asyncio.run_coroutine_threadsafe(chat_model.get_mcp_pool(), other).result(5)
+
+    try:
+        first = _on_other()
+        second = asyncio.run(chat_model.get_mcp_pool())
+        assert second is not first
+        assert not first.stopped
+        assert _on_other() is first
+
+        config["pool"] = {"connect_timeout_s": 1}
+        replaced = _on_other()
+        assert replaced is not first
+        assert first.stopped
+    finally:
+        other.call_soon_threadsafe(other.stop)
+        thread.join(5)
+        other.close()
@@ -1,11 +1,12 @@
 from __future__ import annotations
 
 import asyncio
+from collections.abc import AsyncIterator
 from dataclasses import dataclass
 from typing import Any
 
 from _pytest.monkeypatch import MonkeyPatch
-from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage, SystemMessage
 
 from src.models.chat_model import ToolCallingChatModel
 
@@ -67,3 +68,93 @@ def test_tool_calling_model_no_tools_delegates(monkeypatch: MonkeyPatch) -> None
     )
     assert getattr(out, "tool_calls", None)
     assert len(base.calls) == 1
+
+
+@dataclass
+class _SlowTool:
+    name: str
+    delay: float
+    active: list[int]
+
+    async def ainvoke(self, input: dict[str, Any]) -> str:
+        self.active[0] += 1
+        self.active[1] = max(self.active[1], self.active[0])
+        await asyncio.sleep(self.delay)
+        self.active[0] -= 1
+        return f"{self.name}:{input['q']}"
+
+
+class _MultiCallModel(_BaseModel):
+    async def ainvoke(
+        self,
+        input: Any,
+        config: Any | None = None,
+        **kwargs: Any,
+    ) -> AIMessage:
+        self.calls.append(input)
+        if any(getattr(m, "type", None) == "tool" for m in input):
+            return AIMessage(content="done")
+        return AIMessage(
+            content="",
+            tool_calls=[
+                {"id": "c1", "name": "slow", "args": {"q": "a"}},
+                {"id": "c2", "name": "fast", "args": {"q": "b"}},
+                {"id": "c3", "name": "hang", "args": {"q": "c"}},
+            ],
+        )
+
+
+def test_tool_calls_run_concurrently_in_call_order(monkeypatch: MonkeyPatch) -> None:
+    active = [0, 0]
+    tools = [
+        _SlowTool(name="slow", delay=0.05, active=active),
+        _SlowTool(name="fast", delay=0.0, active=active),
+        _SlowTool(name="hang", delay=5.0, active=active),
+    ]
+    monkeypatch.setattr("src.models.chat_model.load_mcp_tools", lambda: asyncio.sleep(0, tools))
+    base = _MultiCallModel()
+    model = ToolCallingChatModel(base, max_parallel_tool_calls=3, tool_timeout_s=0.2)
+
+    out = asyncio.run(model.ainvoke([HumanMessage(content="h")]))
+
+    assert getattr(out, "content", None) == "done"
+    tool_messages = [m for m in base.calls[-1] if getattr(m, "type", None) == "tool"]
+    assert [m.tool_call_id for m in tool_messages] == ["c1", "c2", "c3"]
+    assert tool_messages[0].content == "slow:a"
+    assert tool_messages[1].content == "fast:b"
+    assert str(tool_messages[2].content).startswith("tool timeout: hang")
+    assert active[1] == 3
+
+
+class _StreamingModel(_BaseModel):
+    async def astream(
+        self,
+        input: Any,
+        config: Any | None = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[AIMessageChunk]:
+        self.calls.append(input)
+        if "tool please" in str(input[-1].content):
+            yield AIMessageChunk(
+                content="",
+                tool_call_chunks=[{"id": "c1", "name": "t1", "args": '{"q": "x"}', "index": 0}],
+            )
+            return
+        for piece in ("he", "llo"):
+            yield AIMessageChunk(content=piece)
+
+
+def test_tool_calling_model_streams_with_tools_bound(monkeypatch: MonkeyPatch) -> None:
+    tool = _Tool(name="t1", calls=[])
+    monkeypatch.setattr("src.models.chat_model.load_mcp_tools", lambda: asyncio.sleep(0, [tool]))
+    model = ToolCallingChatModel(_StreamingModel())
+
+    async def _collect(text: str) -> list[Any]:
+        return [c async for c in model.astream([HumanMessage(content=text)])]
+
+    streamed = asyncio.run(_collect("hi"))
+    assert [c.content for c in streamed] == ["he", "llo"]
+
+    with_tools = asyncio.run(_collect("tool please"))
+    assert [getattr(c, "content", None) for c in with_tools] == ["done"]
+    assert tool.calls == [{"q": "x"}]
@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+from typing import Any
+
+from _pytest.monkeypatch import MonkeyPatch
+
+from src.models import chat_model
+
+
+def test_init_chat_model_reuses_clients_until_config_changes(monkeypatch: MonkeyPatch) -> None:
+    models: dict[str, Any] = {
+        "chat_model": {"model": "gpt-test", "api_key": "k", "temperature": 0},
+        "http": {"max_connections": 10},
+    }
+
+    def _section(keys: list[str]) -> dict[str, Any] | None:
+        return models if keys == ["models"] else None
+
+    monkeypatch.setattr(chat_model, "get_config_section", _section)
+    monkeypatch.setattr(chat_model, "_MODEL_REGISTRY", chat_model.ModelRegistry())
+
+    first = chat_model.init_chat_model()
+    assert chat_model.init_chat_model() is first
+
+    models["chat_model"] = {**models["chat_model"], "temperature": 0.5}
+    second = chat_model.init_chat_model()
+    assert second is not first
+    assert chat_model.init_chat_model() is second
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+
+import pytest
+
+from src.agent.review_handler import ReviewService
+from src.models.enums import Mode
+from src.models.router import build_model_router
+
+
+@dataclass
+class _Result:
+    content: str
+
+
+class _NamedModel:
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.calls = 0
+
+    async def ainvoke(
+        self,
+        input: object,
+        config: object | None = None,
+        **kwargs: object,
+    ) -> _Result:
+        self.calls += 1
+        assert isinstance(input, list)
+        text = str(input[-1].content)
+        if "Document:" in text:
+            return _Result(content="[{\"id\": \"T1\", \"title\": \"t1\"}]")
+        if "Content:" in text:
+            return _Result(content="{\"covered\": [\"T1\"], \"markdown\": \"p\"}")
+        return _Result(content=self.name)
+
+
+def test_model_router_resolves_mode_then_default_then_fallback() -> None:
+    default = _NamedModel("chat_model")
+    router = build_model_router(
+        {"default": {"chunk": "fast"}, "trd_review": {"chunk": "chat_model"}},
+        default,
+        _NamedModel,
+    )
+
+    assert router.resolve(Mode.prd_review, "chunk") is router.models["fast"]
+    assert router.resolve(Mode.trd_review, "chunk") is default
+    assert router.resolve(Mode.prd_review, "final") is default
+    with pytest.raises(ValueError, match="Unknown stage"):
+        build_model_router({"default": {"summarize": "fast"}}, default, _NamedModel)
+
+
+def test_review_service_uses_routed_model_per_stage() -> None:
+    strong = _NamedModel("strong")
+    router = build_model_router(
+        {"default": {"plan": "fast", "chunk": "fast"}},
+        strong,
+        _NamedModel,
+    )
+    service = ReviewService(model=strong, max_chars_per_chunk=2, router=router)
+
+    result = asyncio.run(service.review(mode=Mode.prd_review, language="zh", document="aabb"))
+
+    assert result == "strong"
+    assert strong.calls == 1
+    fast = router.models["fast"]
+    assert isinstance(fast, _NamedModel) and fast.calls == 3
@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+from src.agent.outline import build_outline
+
+_DOC = (
+    "前言文字\n"
+    "# 概述\n"
+    "背景。\n"
+    "## 1.1 目标\n"
+    "<table><tr><td>a</td></tr></table>\n"
+    "# 需求\n"
+    "1. 列表项不是标题\n"
+    "| a | b |\n"
+    "|---|---|\n"
+    "| 1 | 2 |\n"
+)
+
+
+def test_build_outline_indexes_headings_offsets_and_tables() -> None:
+    outline = build_outline(_DOC)
+    titles = [(s.level, s.title) for s in outline.sections]
+    assert titles == [(1, ""), (1, "概述"), (2, "1.1 目标"), (1, "需求")]
+
+    overview = outline.sections[1]
+    assert _DOC[overview.start :].startswith("# 概述")
+    assert overview.end == _DOC.index("# 需求")
+    assert [s.tables for s in outline.sections] == [0, 0, 1, 1]
+    assert outline.section_at(_DOC.index("<table>")) == outline.sections[2]
+
+
+def test_outline_render_and_sample_are_bounded() -> None:
+    outline = build_outline(_DOC)
+    full = outline.render(10_000)
+    assert "1.1 目标" in full
+    assert "1.1 目标" not in outline.render(len(full) - 1)
+
+    sample = outline.sample(_DOC, 30)
+    assert sample.startswith("前言文字")
+    assert "# 概述" in sample and "# 需求" in sample
@@ -1,7 +1,9 @@
 from __future__ import annotations
 
+from pathlib import Path
+
 from src.models.enums import Mode
-from src.prompt.registry import get_prompt_text
+from src.prompt.registry import PromptRegistry, get_prompt_text
 
 
 def test_get_prompt_text_for_all_modes() -> None:
@@ -9,3 +11,19 @@ def test_get_prompt_text_for_all_modes() -> None:
         text = get_prompt_text(mode)
         assert isinstance(text, str)
         assert text.strip() != ""
+
+
+def test_prompt_registry_versions_and_hot_reload(tmp_path: Path) -> None:
+    for mode in Mode:
+        (tmp_path / f"{mode.value}.md").write_text(f"{mode.value} v1", encoding="utf-8")
+    registry = PromptRegistry(templates_dir=tmp_path, hot_reload=True, revalidate_interval_s=0)
+    first = registry.get(Mode.chat)
+    assert first.version == 1
+    assert registry.get(Mode.chat) is first
+
+    (tmp_path / "chat.md").write_text("chat v2 with more text", encoding="utf-8")
+    second = registry.get(Mode.chat)
+    assert second.text == "chat v2 with more text"
+    assert second.version == 2
+    assert second.sha256 != first.sha256
+    assert registry.get(Mode.prd_review).version == 1
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import asyncio
+
+import httpx
+import openai
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+from src.models.chat_model import RateLimitedChatModel, RateLimiter, get_rate_limiter
+
+
+def _error(status: int, cls: type[openai.APIStatusError]) -> openai.APIStatusError:
+    response = httpx.Response(
+        status,
+        headers={"retry-after": "0"},
+        request=httpx.Request("POST", "http://provider/v1/chat/completions"),
+    )
+    return cls("boom", response=response, body=None)
+
+
+class _FlakyModel:
+    def __init__(self, errors: list[Exception]) -> None:
+        self.errors = errors
+        self.calls = 0
+
+    async def ainvoke(
+        self,
+        input: object,
+        config: object | None = None,
+        **kwargs: object,
+    ) -> AIMessage:
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return AIMessage(content="ok")
+
+
+def test_rate_limited_model_retries_429_and_5xx() -> None:
+    base = _FlakyModel(
+        [
+            _error(429, openai.RateLimitError),
+            _error(503, openai.InternalServerError),
+        ]
+    )
+    model = RateLimitedChatModel(base, RateLimiter(requests_per_minute=600), max_retries=3)
+
+    out = asyncio.run(model.ainvoke([HumanMessage(content="hi")]))
+
+    assert getattr(out, "content", None) == "ok"
+    assert base.calls == 3
+
+
+def test_rate_limited_model_does_not_retry_client_errors() -> None:
+    base = _FlakyModel([_error(400, openai.BadRequestError)])
+    model = RateLimitedChatModel(base, RateLimiter(), max_retries=3)
+
+    with pytest.raises(openai.BadRequestError):
+        asyncio.run(model.ainvoke([HumanMessage(content="hi")]))
+    assert base.calls == 1
+
+
+def test_rate_limiter_is_rebuilt_when_settings_change() -> None:
+    first = get_rate_limiter("m", {"requests_per_minute": 60})
+    assert get_rate_limiter("m", {"requests_per_minute": 60}) is first
+    changed = get_rate_limiter("m", {"requests_per_minute": 120})
+    assert changed is not first
+    assert changed._rpm == 120.0
+
+
+def test_rate_limiter_can_be_shared_across_event_loops() -> None:
+    limiter = RateLimiter(requests_per_minute=6000)
+
+    async def _burst() -> None:
+        await asyncio.gather(*(limiter.acquire(1) for _ in range(3)))
+
+    asyncio.run(_burst())
+    asyncio.run(_burst())
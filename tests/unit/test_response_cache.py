@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+from typing import Any
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
+from src.models.response_cache import CachingChatModel, ResponseCache
+
+
+class _BaseModel:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    async def ainvoke(
+        self,
+        input: Any,
+        config: Any | None = None,
+        **kwargs: Any,
+    ) -> AIMessage:
+        self.calls += 1
+        return AIMessage(content=f"answer {self.calls}")
+
+
+def test_caching_chat_model_hits_on_identical_messages(tmp_path: Path) -> None:
+    base = _BaseModel()
+    cache = ResponseCache(directory=tmp_path, ttl_seconds=60, max_bytes=1_000_000)
+    model = CachingChatModel(base, cache, namespace="m")
+
+    messages = [SystemMessage(content="s"), HumanMessage(content="h")]
+    first = asyncio.run(model.ainvoke(messages))
+    second = asyncio.run(model.ainvoke(list(messages)))
+    other = asyncio.run(model.ainvoke([SystemMessage(content="s"), HumanMessage(content="x")]))
+
+    assert first.content == second.content == "answer 1"
+    assert second.response_metadata["cache_hit"] is True
+    assert other.content == "answer 2"
+    assert base.calls == 2
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.entries) == (1, 2, 2)
+
+    reopened = ResponseCache(directory=tmp_path, ttl_seconds=60, max_bytes=1_000_000)
+    again = asyncio.run(CachingChatModel(base, reopened, namespace="m").ainvoke(messages))
+    assert again.content == "answer 1"
+
+
+def test_response_cache_expires_and_evicts_lru(tmp_path: Path) -> None:
+    probe = ResponseCache(directory=tmp_path / "probe", ttl_seconds=60, max_bytes=1_000_000)
+    probe.put("x", AIMessage(content="a"))
+    entry_size = probe.stats().bytes
+
+    cache = ResponseCache(directory=tmp_path / "lru", ttl_seconds=60, max_bytes=2 * entry_size + 16)
+    cache.put("a", AIMessage(content="a"))
+    cache.put("b", AIMessage(content="b"))
+    assert cache.get("a") is not None
+    cache.put("c", AIMessage(content="c"))
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.stats().evictions == 1
+
+    expired = ResponseCache(directory=tmp_path / "lru", ttl_seconds=0, max_bytes=1_000_000)
+    assert expired.get("c") is None
+    assert not (tmp_path / "lru" / "c.json").exists()
@@ -1,11 +1,16 @@
 from __future__ import annotations
 
 import asyncio
+import json
+import time
+from collections.abc import AsyncIterator
 from dataclasses import dataclass
 
 import pytest
 
-from src.agent.review_handler import ReviewService
+from src.agent.budget import LatencyStats
+from src.agent.chunker import TokenChunker
+from src.agent.review_handler import PlanItem, ReviewRecord, ReviewService
 from src.models.enums import Mode
 from src.models.events import EventType
 
@@ -98,3 +103,414 @@ def test_review_service_plan_fallback_parses_lines() -> None:
     )
 
     assert result == "final"
+
+
+class _ConcurrentModel:
+    def __init__(self) -> None:
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def ainvoke(
+        self,
+        input: object,
+        config: object | None = None,
+        **kwargs: object,
+    ) -> _Result:
+        assert isinstance(input, list)
+        text = str(input[-1].content)
+        if "Document:" in text:
+            return _Result(content="[{\"id\": \"T1\", \"title\": \"t1\"}]")
+        if "Findings:" in text:
+            return _Result(content=text.split("Findings:\n", 1)[1])
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        chunk = text.split("Content:\n", 1)[1]
+        await asyncio.sleep(0.01 if chunk == "aa" else 0)
+        self.in_flight -= 1
+        return _Result(content=json.dumps({"covered": ["T1"], "markdown": chunk.upper()}))
+
+
+def test_review_service_concurrent_keeps_document_order() -> None:
+    model = _ConcurrentModel()
+    service = ReviewService(model=model, max_chars_per_chunk=2, max_concurrency=2)
+
+    events: list[tuple[EventType, str]] = []
+
+    async def emit(event_type: EventType, message: str) -> None:
+        events.append((event_type, message))
+
+    result = asyncio.run(
+        service.review(
+            mode=Mode.trd_review,
+            language="zh",
+            document="aabbccdd",
+            emit=emit,
+        )
+    )
+
+    assert result == "AA\n\nBB\n\nCC\n\nDD"
+    assert model.max_in_flight == 2
+    assert [m for t, m in events if t == EventType.todo].count("[done] T1 t1") == 1
+
+
+def test_review_service_reviews_near_duplicate_chunks_once() -> None:
+    model = _ConcurrentModel()
+    service = ReviewService(model=model, max_chars_per_chunk=2, dedup_threshold=0.9)
+    record = ReviewRecord()
+
+    events: list[tuple[EventType, str]] = []
+
+    async def emit(event_type: EventType, message: str) -> None:
+        events.append((event_type, message))
+
+    result = asyncio.run(
+        service.review(
+            mode=Mode.trd_review,
+            language="zh",
+            document="aabbaacc",
+            emit=emit,
+            record=record,
+        )
+    )
+
+    assert result.startswith("AA\n\n（以上发现同样适用于内容重复的片段 1, 3）")
+    assert result.endswith("BB\n\nCC")
+    assert record.reviewed == 3
+    assert record.deduplicated == 1
+    assert len(record.chunks) == 3
+    assert (EventType.info, "deduplicated 1/4 chunks") in events
+
+
+def test_review_service_review_many_runs_modes_over_shared_chunks() -> None:
+    model = _ConcurrentModel()
+    service = ReviewService(model=model, max_chars_per_chunk=2, max_concurrency=2)
+    events: list[tuple[Mode, EventType, str]] = []
+
+    async def emit(mode: Mode, event_type: EventType, message: str) -> None:
+        events.append((mode, event_type, message))
+
+    results = asyncio.run(
+        service.review_many(
+            modes=[Mode.prd_review, Mode.trd_review],
+            language="zh",
+            document="aabbccdd",
+            emit=emit,
+        )
+    )
+
+    assert results == {
+        Mode.prd_review: "AA\n\nBB\n\nCC\n\nDD",
+        Mode.trd_review: "AA\n\nBB\n\nCC\n\nDD",
+    }
+    assert model.max_in_flight == 2
+    assert {m for m, t, msg in events if msg == "producing"} == {
+        Mode.prd_review,
+        Mode.trd_review,
+    }
+
+
+class _SlowChunkModel:
+    async def ainvoke(
+        self,
+        input: object,
+        config: object | None = None,
+        **kwargs: object,
+    ) -> _Result:
+        assert isinstance(input, list)
+        text = str(input[-1].content)
+        if "Findings:" in text:
+            return _Result(content=text.split("Findings:\n", 1)[1])
+        chunk = text.split("Content:\n", 1)[1]
+        if chunk == "bb":
+            await asyncio.sleep(5)
+        return _Result(content=json.dumps({"covered": ["T1"], "markdown": chunk.upper()}))
+
+
+def test_review_service_time_budget_finalizes_partial_report() -> None:
+    latency = LatencyStats(defaults={"plan": 1.0, "chunk": 0.05, "final": 0.05})
+    service = ReviewService(
+        model=_SlowChunkModel(),
+        max_chars_per_chunk=2,
+        max_concurrency=2,
+        latency=latency,
+    )
+    record = ReviewRecord()
+    events: list[tuple[EventType, str]] = []
+
+    async def emit(event_type: EventType, message: str) -> None:
+        events.append((event_type, message))
+
+    result = asyncio.run(
+        service.review(
+            mode=Mode.prd_review,
+            language="zh",
+            document="aa\n\nbb",
+            emit=emit,
+            record=record,
+            time_budget_s=0.3,
+        )
+    )
+
+    assert record.partial
+    assert record.plan[0].title == "整体评审"
+    assert result.startswith("> 注意：受时间预算限制，本报告仅基于已完成的 1 个片段生成")
+    assert "BB" not in result
+    assert any(m.startswith("deadline reached") for t, m in events)
+
+
+
+def test_review_service_time_budget_counts_from_request_arrival() -> None:
+    latency = LatencyStats(defaults={"plan": 1.0, "chunk": 0.05, "final": 0.05})
+    service = ReviewService(model=_ConcurrentModel(), max_chars_per_chunk=2, latency=latency)
+    record = ReviewRecord()
+
+    result = asyncio.run(
+        service.review(
+            mode=Mode.prd_review,
+            language="zh",
+            document="aabbcc",
+            record=record,
+            time_budget_s=0.3,
+            started_at=time.monotonic() - 10,
+        )
+    )
+
+    assert record.partial
+    assert result.startswith("> 注意：受时间预算限制，本报告仅基于已完成的 1 个片段生成")
+    assert "AA" in result
+    assert "BB" not in result
+
+
+def test_review_service_budget_below_finalize_estimate_still_reviews_a_chunk() -> None:
+    service = ReviewService(model=_ConcurrentModel(), max_chars_per_chunk=2)
+    record = ReviewRecord()
+
+    result = asyncio.run(
+        service.review(
+            mode=Mode.prd_review,
+            language="zh",
+            document="aabbcc",
+            record=record,
+            time_budget_s=20,
+        )
+    )
+
+    assert "已完成的 0 个片段" not in result
+    assert any(chunk in result for chunk in ("AA", "BB", "CC"))
+
+class _ReduceModel:
+    def __init__(self) -> None:
+        self.merges: list[str] = []
+        self.final_input = ""
+
+    async def ainvoke(
+        self,
+        input: object,
+        config: object | None = None,
+        **kwargs: object,
+    ) -> _Result:
+        assert isinstance(input, list)
+        text = str(input[-1].content)
+        if "Document:" in text:
+            return _Result(content="[\"t1\"]")
+        if "Content:" in text:
+            chunk = text.split("Content:\n", 1)[1]
+            return _Result(content=json.dumps({"covered": [], "markdown": chunk * 4}))
+        findings = text.split("Findings:\n", 1)[1]
+        if "合并" in text:
+            self.merges.append(findings)
+            return _Result(content="m")
+        self.final_input = findings
+        return _Result(content="final")
+
+
+def test_review_service_tree_reduces_oversized_findings() -> None:
+    model = _ReduceModel()
+    service = ReviewService(
+        model=model,
+        max_chars_per_chunk=4,
+        max_concurrency=3,
+        max_findings_tokens=9,
+    )
+
+    events: list[tuple[EventType, str]] = []
+
+    async def emit(event_type: EventType, message: str) -> None:
+        events.append((event_type, message))
+
+    result = asyncio.run(
+        service.review(
+            mode=Mode.prd_review,
+            language="zh",
+            document="aaaa\n\nbbbb\n\ncccc\n\ndddd",
+            emit=emit,
+        )
+    )
+
+    assert result == "final"
+    assert model.merges == ["a" * 16 + "\n\n" + "b" * 16, "c" * 16 + "\n\n" + "d" * 16]
+    assert model.final_input == "m\n\nm"
+    assert (EventType.info, "merging 4->2") in events
+
+
+def test_review_stream_reviews_chunks_while_segments_arrive() -> None:
+    model = _ConcurrentModel()
+    service = ReviewService(
+        model=model,
+        max_concurrency=2,
+        chunker=TokenChunker(max_tokens=3, count_tokens=len),
+        stream_plan_chars=2,
+    )
+    seen_before_last_segment: list[int] = []
+
+    async def segments() -> AsyncIterator[str]:
+        yield "aa\n"
+        yield "bb\n"
+        await asyncio.sleep(0.05)
+        seen_before_last_segment.append(model.max_in_flight)
+        yield "cc\n"
+
+    events: list[tuple[EventType, str]] = []
+
+    async def emit(event_type: EventType, message: str) -> None:
+        events.append((event_type, message))
+
+    result = asyncio.run(
+        service.review_stream(
+            mode=Mode.prd_review,
+            language="zh",
+            segments=segments(),
+            emit=emit,
+        )
+    )
+
+    assert result.split() == ["AA", "BB", "CC"]
+    assert seen_before_last_segment == [1]
+    assert [m for t, m in events if t == EventType.info and m.startswith("executing")] == [
+        "executing 1",
+        "executing 2",
+        "executing 3",
+    ]
+
+
+def test_review_service_reuses_unchanged_chunks_from_previous_record() -> None:
+    model = _ConcurrentModel()
+    service = ReviewService(model=model, max_chars_per_chunk=2)
+    first = ReviewRecord()
+    asyncio.run(
+        service.review(mode=Mode.prd_review, language="zh", document="aabbcc", record=first)
+    )
+    assert (first.reviewed, first.reused) == (3, 0)
+
+    calls: list[str] = []
+    original = model.ainvoke
+
+    async def counting(input: object, config: object | None = None, **kwargs: object) -> _Result:
+        assert isinstance(input, list)
+        calls.append(str(input[-1].content))
+        return await original(input, config=config, **kwargs)
+
+    model.ainvoke = counting  # type: ignore[method-assign]
+    second = ReviewRecord()
+    result = asyncio.run(
+        service.review(
+            mode=Mode.prd_review,
+            language="zh",
+            document="aaxxcc",
+            record=second,
+            previous=first,
+        )
+    )
+
+    assert result == "AA\n\nXX\n\nCC"
+    assert (second.reviewed, second.reused) == (1, 2)
+    assert second.plan == first.plan
+    assert not any("Document:" in c for c in calls)
+    assert len(calls) == 2
+
+
+class _StreamingModel(_FakeModel):
+    async def astream(
+        self,
+        input: object,
+        config: object | None = None,
+        **kwargs: object,
+    ) -> AsyncIterator[_Result]:
+        self.calls.append(input)
+        for piece in ["# 报告", "\n", "结论"]:
+            yield _Result(content=piece)
+
+
+def test_review_service_streams_final_tokens() -> None:
+    model = _StreamingModel(
+        responses=["[\"t1\"]", "{\"covered\": [\"T1\"], \"markdown\": \"p\"}"]
+    )
+    service = ReviewService(model=model)
+    tokens: list[str] = []
+
+    async def on_token(text: str) -> None:
+        tokens.append(text)
+
+    result = asyncio.run(
+        service.review(mode=Mode.prd_review, language="zh", document="abc", on_token=on_token)
+    )
+
+    assert tokens == ["# 报告", "\n", "结论"]
+    assert result == "# 报告\n结论"
+
+
+class _MergeCountingModel(_ConcurrentModel):
+    def __init__(self) -> None:
+        super().__init__()
+        self.merges_in_flight = 0
+        self.max_merges_in_flight = 0
+
+    async def ainvoke(
+        self,
+        input: object,
+        config: object | None = None,
+        **kwargs: object,
+    ) -> _Result:
+        assert isinstance(input, list)
+        if "Findings:" not in str(input[-1].content):
+            return await super().ainvoke(input, config, **kwargs)
+        self.merges_in_flight += 1
+        self.max_merges_in_flight = max(self.max_merges_in_flight, self.merges_in_flight)
+        await asyncio.sleep(0.01)
+        self.merges_in_flight -= 1
+        return _Result(content="merged")
+
+
+def test_review_service_merges_share_the_run_semaphore() -> None:
+    model = _MergeCountingModel()
+    service = ReviewService(
+        model=model, max_chars_per_chunk=2, max_concurrency=1, max_findings_tokens=1
+    )
+
+    asyncio.run(
+        service.review_many(
+            modes=[Mode.prd_review, Mode.trd_review], language="zh", document="aabbccdd"
+        )
+    )
+
+    assert model.max_merges_in_flight == 1
+
+
+def test_review_service_ignores_previous_plan_from_another_mode() -> None:
+    model = _ConcurrentModel()
+    service = ReviewService(model=model, max_chars_per_chunk=10)
+    previous = ReviewRecord(mode=Mode.prd_review, plan=[PlanItem(id="P1", title="old")])
+    record = ReviewRecord()
+
+    asyncio.run(
+        service.review(
+            mode=Mode.trd_review,
+            language="zh",
+            document="aabb",
+            record=record,
+            previous=previous,
+        )
+    )
+
+    assert record.mode == Mode.trd_review
+    assert [p.id for p in record.plan] == ["T1"]
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+
+from _pytest.monkeypatch import MonkeyPatch
+from langchain_core.messages import AIMessage, HumanMessage
+
+from src.models.chat_model import ToolCallingChatModel
+from src.models.tool_cache import ToolResultCache, tool_cache_key
+from src.models.usage import track_usage
+
+
+class _CountingTool:
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.calls = 0
+
+    async def ainvoke(self, input: dict[str, Any]) -> dict[str, Any]:
+        self.calls += 1
+        return {"tool": self.name, **input}
+
+
+class _LookupModel:
+    def bind_tools(self, tools: list[Any]) -> _LookupModel:
+        return self
+
+    async def ainvoke(self, input: Any, config: Any | None = None, **kwargs: Any) -> AIMessage:
+        if any(getattr(m, "type", None) == "tool" for m in input):
+            return AIMessage(content="done")
+        return AIMessage(
+            content="",
+            tool_calls=[
+                {"id": "c1", "name": "glossary", "args": {"term": "SLA", "lang": "en"}},
+                {"id": "c2", "name": "notify", "args": {"to": "x"}},
+            ],
+        )
+
+
+def test_tool_cache_key_ignores_argument_order() -> None:
+    assert tool_cache_key("t", {"a": 1, "b": 2}) == tool_cache_key("t", {"b": 2, "a": 1})
+    assert tool_cache_key("t", {"a": 1}) != tool_cache_key("u", {"a": 1})
+
+
+def test_tool_result_cache_expires_and_bounds_entries() -> None:
+    cache = ToolResultCache(max_entries=2)
+    cache.put("a", "1", ttl_seconds=60)
+    cache.put("b", "2", ttl_seconds=60)
+    cache.put("c", "3", ttl_seconds=60)
+    cache.put("d", "4", ttl_seconds=0)
+    assert cache.get("a") is None
+    assert cache.get("c") == "3"
+    assert cache.get("d") is None
+    stats = cache.stats()
+    assert (stats.entries, stats.evictions, stats.hits, stats.misses) == (2, 1, 1, 2)
+
+
+def test_repeated_tool_calls_are_served_from_cache(monkeypatch: MonkeyPatch) -> None:
+    glossary = _CountingTool("glossary")
+    notify = _CountingTool("notify")
+    monkeypatch.setattr(
+        "src.models.chat_model.load_mcp_tools", lambda: asyncio.sleep(0, [glossary, notify])
+    )
+    model = ToolCallingChatModel(
+        _LookupModel(),
+        tool_cache=ToolResultCache(),
+        tool_cache_ttl=lambda name: 300.0 if name == "glossary" else 0.0,
+    )
+
+    async def _run() -> None:
+        for _ in range(3):
+            await model.ainvoke([HumanMessage(content="h")])
+
+    with track_usage() as usage:
+        asyncio.run(_run())
+
+    assert glossary.calls == 1
+    assert notify.calls == 3
+    assert usage.tool_calls == 6
+    assert usage.tool_cache_hits == 2
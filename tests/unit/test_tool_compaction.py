@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import Any
+
+from _pytest.monkeypatch import MonkeyPatch
+from langchain_core.messages import AIMessage, HumanMessage
+
+from src.models.chat_model import ToolCallingChatModel
+from src.models.tool_compaction import ToolCompaction
+from src.models.usage import track_usage
+from src.utils.tokens import estimate_tokens
+
+
+def test_compact_trims_json_structurally_within_budget() -> None:
+    payload = json.dumps(
+        {"items": [{"id": i, "body": "x" * 800} for i in range(200)], "total": 200}
+    )
+    result = ToolCompaction().compact(payload, 300)
+
+    assert result.tokens <= 300
+    assert result.elided_tokens > 0
+    trimmed = json.loads(result.content)
+    assert trimmed["total"] == 200
+    assert "more items elided" in trimmed["items"][-1]
+
+
+def test_compact_truncates_plain_text_and_keeps_small_results() -> None:
+    compaction = ToolCompaction()
+    assert compaction.compact("short", 100).content == "short"
+    result = compaction.compact("word " * 5000, 100)
+    assert result.tokens <= 100
+    assert "chars elided" in result.content
+
+
+class _PagingModel:
+    def __init__(self) -> None:
+        self.prompt_tokens: list[int] = []
+
+    def bind_tools(self, tools: list[Any]) -> _PagingModel:
+        return self
+
+    async def ainvoke(self, input: Any, config: Any | None = None, **kwargs: Any) -> AIMessage:
+        self.prompt_tokens.append(sum(estimate_tokens(str(m.content)) for m in input))
+        rounds = sum(1 for m in input if getattr(m, "type", None) == "tool")
+        if rounds >= 4:
+            return AIMessage(content="done")
+        return AIMessage(
+            content="", tool_calls=[{"id": f"c{rounds}", "name": "page", "args": {"n": rounds}}]
+        )
+
+
+class _PageTool:
+    name = "page"
+
+    async def ainvoke(self, input: dict[str, Any]) -> str:
+        return "line of a large document\n" * 2000
+
+
+def test_stale_tool_results_are_shortened_between_iterations(monkeypatch: MonkeyPatch) -> None:
+    monkeypatch.setattr(
+        "src.models.chat_model.load_mcp_tools", lambda: asyncio.sleep(0, [_PageTool()])
+    )
+    base = _PagingModel()
+    model = ToolCallingChatModel(
+        base,
+        compaction=ToolCompaction(
+            max_result_tokens=500, turn_budget_tokens=500, stale_result_tokens=50
+        ),
+    )
+
+    with track_usage() as usage:
+        out = asyncio.run(model.ainvoke([HumanMessage(content="h")]))
+
+    assert getattr(out, "content", None) == "done"
+    growth = [b - a for a, b in zip(base.prompt_tokens, base.prompt_tokens[1:], strict=False)]
+    assert max(base.prompt_tokens) < 1000
+    assert growth[-1] < 200
+    assert usage.tool_tokens_elided > 0
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import asyncio
+
+from _pytest.monkeypatch import MonkeyPatch
+from langchain_core.messages import AIMessage, HumanMessage
+
+from src.models.chat_model import ToolCallingChatModel
+from src.models.usage import TokenUsage, UsageTracker, track_usage, usage_from_message
+from src.prompt.assembly import PromptLayout
+
+
+class _UsageModel:
+    async def ainvoke(
+        self,
+        input: object,
+        config: object | None = None,
+        **kwargs: object,
+    ) -> AIMessage:
+        return AIMessage(
+            content="ok",
+            usage_metadata={
+                "input_tokens": 100,
+                "output_tokens": 5,
+                "total_tokens": 105,
+                "input_token_details": {"cache_read": 80},
+            },
+        )
+
+
+def test_usage_from_message_reads_openai_token_usage() -> None:
+    message = AIMessage(
+        content="ok",
+        response_metadata={
+            "token_usage": {
+                "prompt_tokens": 10,
+                "completion_tokens": 2,
+                "prompt_tokens_details": {"cached_tokens": 4},
+            }
+        },
+    )
+    assert usage_from_message(message) == TokenUsage(10, 2, 4)
+
+
+def test_track_usage_records_tool_calling_model_results(monkeypatch: MonkeyPatch) -> None:
+    monkeypatch.setattr("src.models.chat_model.load_mcp_tools", lambda: asyncio.sleep(0, []))
+    model = ToolCallingChatModel(_UsageModel())
+
+    async def _run() -> UsageTracker:
+        with track_usage() as usage:
+            await model.ainvoke([HumanMessage(content="a")])
+            await model.ainvoke([HumanMessage(content="b")])
+        return usage
+
+    usage = asyncio.run(_run())
+    assert usage.calls == 2
+    assert usage.cached_tokens == 160
+    assert usage.cache_hit_rate == 0.8
+
+
+def test_prompt_layout_shares_prefix_across_calls() -> None:
+    layout = PromptLayout(system_prompt="sys", language="zh").with_plan("- T1 a")
+    first = layout.messages("Content:\nx")
+    second = layout.messages("Content:\ny")
+    assert first[:-1] == second[:-1]
+    assert first[-1] != second[-1]